@@ -6,10 +6,11 @@ FastAPI server to serve the LangGraph agent system to the frontend
 
 from fastapi import FastAPI, HTTPException, Header, Body
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, Response
+from fastapi.responses import StreamingResponse, Response, ORJSONResponse
 from pydantic import BaseModel
 import asyncio
 import json
+import orjson
 import os
 import re
 from typing import Dict, Any, List, Optional
@@ -17,7 +18,7 @@ import uuid
 from datetime import datetime
 
 # Import our agent system
-from vedya_agents import create_vedya_langgraph_system
+from vedya_agents import create_vedya_langgraph_system, close_http_client
 from email_service import email_service
 from user_service import UserService
 from ai_planning_agent import ai_planning_agent
@@ -76,6 +77,13 @@ async def startup_event():
         print(f"❌ Failed to initialize system: {e}")
         raise
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release the shared database pool and LLM HTTP client."""
+    if user_service:
+        await user_service.close()
+    await close_http_client()
+
 @app.get("/")
 async def root():
     """Health check endpoint."""
@@ -525,7 +533,8 @@ async def list_chat_sessions(clerk_user_id: str):
     if not user_service:
         raise HTTPException(status_code=500, detail="User service not initialized")
     sessions = await user_service.list_chat_conversations(clerk_user_id)
-    return {"sessions": sessions}
+    # ORJSONResponse directly: row datetimes are serialized by orjson, skipping jsonable_encoder
+    return ORJSONResponse({"sessions": sessions})
 
 @app.delete("/chat/sessions/{session_id}")
 async def delete_chat_session(session_id: str, clerk_user_id: str):
@@ -545,7 +554,7 @@ async def get_chat_messages(session_id: str):
     if not user_service:
         raise HTTPException(status_code=500, detail="User service not initialized")
     messages = await user_service.get_chat_messages(session_id)
-    return {"messages": messages}
+    return ORJSONResponse({"messages": messages})
 
 # App settings (e.g. configurable plan-ready message shown when a learning plan is generated)
 @app.get("/settings/plan-ready-message")
@@ -731,7 +740,7 @@ def _shape_plan_for_frontend(
     plan_id: str,
     title: str,
     summary: str,
-    created_at: Optional[str],
+    created_at: Optional[datetime],
     plan_data: Dict[str, Any],
     time_spent_minutes: int = 0,
     overall_progress: int = 0,
@@ -794,7 +803,7 @@ def _shape_plan_for_frontend(
         "overallProgress": overall_progress,
         "timeSpentMinutes": time_spent_minutes,
         "progressData": progress_data,
-        "createdAt": created_at or datetime.now().isoformat(),
+        "createdAt": created_at or datetime.now(),
         "plan_data": plan_data,
     }
 
@@ -823,7 +832,7 @@ async def get_learning_plans(clerk_user_id: str = None, authorization: str = Hea
             )
             for r in rows
         ]
-        return {"success": True, "plans": plans}
+        return ORJSONResponse({"success": True, "plans": plans})
     except Exception as e:
         print(f"Error getting learning plans: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -867,7 +876,7 @@ async def get_learning_plan_by_id(plan_id: str, clerk_user_id: str = None, autho
             overall_progress=int(row.get("overall_progress") or 0),
             progress_data=row.get("progress_data") if isinstance(row.get("progress_data"), dict) else {},
         )
-        return {"success": True, "plan": plan}
+        return ORJSONResponse({"success": True, "plan": plan})
     except HTTPException:
         raise
     except Exception as e:
@@ -910,7 +919,8 @@ async def update_learning_plan_progress(plan_id: str, body: dict = Body(default=
         if time_spent_minutes is not None:
             time_spent_minutes = int(time_spent_minutes)
         if overall_progress is not None:
-            overall_progress = min(100, max(0, int(overall_progress)))
+            overall_progress = int(overall_progress)
+            overall_progress = 0 if overall_progress < 0 else 100 if overall_progress > 100 else overall_progress
         ok = await user_service.update_plan_progress(plan_id, cid, time_spent_minutes=time_spent_minutes, overall_progress=overall_progress, progress_data=progress_data)
         if not ok:
             raise HTTPException(status_code=404, detail="Learning plan not found")
@@ -1154,8 +1164,8 @@ async def teaching_chat(request: dict):
                 # Return streaming response
                 async def generate_stream():
                     async for chunk in teaching_assistant.stream_teaching_chat(message, session_context):
-                        yield f"data: {json.dumps(chunk)}\n\n"
-                    yield f"data: {json.dumps({'type': 'done'})}\n\n"
+                        yield b"data: " + orjson.dumps(chunk) + b"\n\n"
+                    yield b'data: {"type":"done"}\n\n'
                 
                 return StreamingResponse(
                     generate_stream(),
@@ -1619,7 +1629,7 @@ async def create_assessment(request: dict):
                 learning_style=learning_style,
                 previous_responses=previous_responses
             )
-            return result
+            return ORJSONResponse(result)
         else:
             # Fallback response
             return {
@@ -1659,6 +1669,44 @@ async def create_assessment(request: dict):
         print(f"Error creating assessment: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to create assessment: {str(e)}")
 
+@app.post("/teaching/assessment/create/stream")
+async def create_assessment_stream(request: dict):
+    """Stream an assessment over SSE: one event per question as it is generated, then the full assessment."""
+    concept = request.get("concept", "")
+    subject = request.get("subject", "Artificial Intelligence")
+    difficulty = request.get("difficulty", "Intermediate")
+    learning_style = request.get("learning_style", "Visual + Hands-on")
+    previous_responses = request.get("previous_responses", [])
+
+    if not concept:
+        raise HTTPException(status_code=400, detail="Concept is required")
+    if not (agent_system and hasattr(agent_system, 'agents') and 'assessment' in agent_system.agents):
+        raise HTTPException(status_code=503, detail="Assessment agent not available")
+
+    assessment_agent = agent_system.agents['assessment']
+
+    async def generate_stream():
+        async for event in assessment_agent.stream_assessment_for_concept(
+            concept=concept,
+            subject=subject,
+            difficulty=difficulty,
+            learning_style=learning_style,
+            previous_responses=previous_responses
+        ):
+            yield b"data: " + orjson.dumps(event) + b"\n\n"
+        yield b'data: {"type":"done"}\n\n'
+
+    return StreamingResponse(
+        generate_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Headers": "*",
+        }
+    )
+
 @app.post("/teaching/assessment/grade")
 async def grade_assessment(request: dict):
     """Grade a user's assessment answers."""
@@ -1676,7 +1724,7 @@ async def grade_assessment(request: dict):
                 user_answers=user_answers,
                 assessment=assessment
             )
-            return result
+            return ORJSONResponse(result)
         else:
             # Fallback response
             return {
@@ -1705,6 +1753,25 @@ async def grade_assessment(request: dict):
         print(f"Error grading assessment: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to grade assessment: {str(e)}")
 
+@app.post("/teaching/assessment/grade/batch")
+async def grade_assessments_batch(request: dict):
+    """Grade many submissions in one call: {"submissions": [{"user_answers": [...], "assessment": {...}}, ...]}."""
+    try:
+        submissions = request.get("submissions", [])
+        if not submissions:
+            raise HTTPException(status_code=400, detail="Submissions are required")
+        if not (agent_system and hasattr(agent_system, 'agents') and 'assessment' in agent_system.agents):
+            raise HTTPException(status_code=503, detail="Assessment agent not available")
+        
+        results = await agent_system.agents['assessment'].grade_assessments_batch(submissions)
+        return ORJSONResponse({"success": True, "results": results})
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error batch grading assessments: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to grade assessments: {str(e)}")
+
 @app.post("/teaching/assessment/recommendations")
 async def get_teaching_recommendations(request: dict):
     """Get teaching recommendations based on assessment results."""
@@ -1,5 +1,7 @@
 """Generate inline SVG diagram placeholders as data URLs (no external image service)."""
 import base64
+from functools import lru_cache
+from typing import Tuple
 from xml.sax.saxutils import escape
 
 
@@ -10,6 +12,32 @@ def _hex_from_color_spec(spec: str) -> str:
     return spec.strip()
 
 
+_SVG_TEMPLATE = '''<svg xmlns="http://www.w3.org/2000/svg" width="800" height="600" viewBox="0 0 800 600">
+  <rect width="800" height="600" fill="#{bg}"/>
+  <text x="400" y="260" text-anchor="middle" fill="white" font-family="system-ui,Arial,sans-serif" font-size="36" font-weight="bold">{c}</text>
+  <text x="400" y="320" text-anchor="middle" fill="rgba(255,255,255,0.95)" font-family="system-ui,Arial,sans-serif" font-size="24">{s}</text>
+  <text x="400" y="380" text-anchor="middle" fill="rgba(255,255,255,0.85)" font-family="system-ui,Arial,sans-serif" font-size="20">{t}</text>
+</svg>'''
+
+
+@lru_cache(maxsize=128)
+def _svg_parts(subtitle: str, bg: str) -> Tuple[str, bytes, bytes, bytes]:
+    """
+    Split the SVG for one (subtitle, color) into a pre-encoded data URL head and the tail pieces
+    around the concept and subject text.
+    The head is the invariant markup before the concept text, cut at a 3-byte boundary so its
+    base64 concatenates cleanly with the base64 of the per-call remainder.
+    """
+    svg = _SVG_TEMPLATE.format(bg=bg, c="{c}", s="{s}", t=escape(subtitle))
+    data = svg.encode("utf-8")
+    head_len = data.index(b"{c}")
+    cut = head_len - head_len % 3
+    head_b64 = base64.b64encode(data[:cut]).decode("ascii")
+    before, rest = data[cut:].split(b"{c}", 1)
+    between, after = rest.split(b"{s}", 1)
+    return f"data:image/svg+xml;base64,{head_b64}", before, between, after
+
+
 def make_diagram_data_url(
     concept: str,
     subject: str,
@@ -23,13 +51,7 @@ def make_diagram_data_url(
     bg = _hex_from_color_spec(bg_hex)
     c = escape(concept.replace("_", " ").strip() or "Concept")
     s = escape(subject.strip() or "Subject")
-    t = escape(subtitle.strip() or "Educational Diagram")
-
-    svg = f'''<svg xmlns="http://www.w3.org/2000/svg" width="800" height="600" viewBox="0 0 800 600">
-  <rect width="800" height="600" fill="#{bg}"/>
-  <text x="400" y="260" text-anchor="middle" fill="white" font-family="system-ui,Arial,sans-serif" font-size="36" font-weight="bold">{c}</text>
-  <text x="400" y="320" text-anchor="middle" fill="rgba(255,255,255,0.95)" font-family="system-ui,Arial,sans-serif" font-size="24">{s}</text>
-  <text x="400" y="380" text-anchor="middle" fill="rgba(255,255,255,0.85)" font-family="system-ui,Arial,sans-serif" font-size="20">{t}</text>
-</svg>'''
-    b64 = base64.b64encode(svg.encode("utf-8")).decode("ascii")
-    return f"data:image/svg+xml;base64,{b64}"
+    head, before, between, after = _svg_parts(subtitle.strip() or "Educational Diagram", bg)
+    # Only the part from the concept text onward is encoded per call
+    b64 = base64.b64encode(b"".join((before, c.encode("utf-8"), between, s.encode("utf-8"), after))).decode("ascii")
+    return head + b64
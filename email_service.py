@@ -7,12 +7,14 @@ AWS SES integration for sending learning progress notifications
 import os
 import smtplib
 import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import json
 import logging
 from dotenv import load_dotenv
@@ -22,6 +24,18 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Outbox of the enclosing `email_service.batch()` block, if any
+_outbox: ContextVar[Optional["EmailBatch"]] = ContextVar("email_outbox", default=None)
+
+
+class EmailBatch:
+    """Emails queued inside `VedyaEmailService.batch()`; `results` is filled when the block exits."""
+
+    def __init__(self):
+        self.messages: List[Tuple[str, str, str, Optional[str]]] = []
+        self.results: List[bool] = []
+
+
 class VedyaEmailService:
     """AWS SES email service for VEDYA notifications."""
     
@@ -75,11 +89,16 @@ class VedyaEmailService:
         return msg
     
     async def send_email(self, to_email: str, subject: str, html_content: str, text_content: str = None) -> bool:
-        """Send an email using AWS SES SMTP."""
+        """Send an email using AWS SES SMTP. Inside `batch()` it is queued instead and True means queued."""
         if not self.notifications_enabled:
             logger.info("Email notifications disabled. Skipping email send.")
             return False
         
+        outbox = _outbox.get()
+        if outbox is not None:
+            outbox.messages.append((to_email, subject, html_content, text_content))
+            return True
+        
         try:
             # Create message
             msg = self._create_message(to_email, subject, html_content, text_content)
@@ -95,6 +114,55 @@ class VedyaEmailService:
             logger.error(f"Failed to send email to {to_email}: {e}")
             return False
     
+    async def send_emails(self, emails: List[Tuple[str, str, str, Optional[str]]]) -> List[bool]:
+        """Send many (to_email, subject, html_content, text_content) emails over one SMTP session.
+        The connect/STARTTLS/login handshake is paid once per batch instead of once per email."""
+        if not emails:
+            return []
+        if not self.notifications_enabled:
+            logger.info("Email notifications disabled. Skipping email send.")
+            return [False] * len(emails)
+        
+        def _send_all() -> List[bool]:
+            results = []
+            with self._create_smtp_connection() as server:
+                for to_email, subject, html_content, text_content in emails:
+                    try:
+                        server.send_message(self._create_message(to_email, subject, html_content, text_content))
+                        logger.info(f"Email sent successfully to {to_email}: {subject}")
+                        results.append(True)
+                    except Exception as e:
+                        logger.error(f"Failed to send email to {to_email}: {e}")
+                        results.append(False)
+            return results
+        
+        try:
+            return await asyncio.to_thread(_send_all)
+        except Exception as e:
+            logger.error(f"Failed to send email batch of {len(emails)}: {e}")
+            return [False] * len(emails)
+    
+    @asynccontextmanager
+    async def batch(self):
+        """Queue every email sent inside the block and deliver them together on exit:
+        
+            async with email_service.batch() as outbox:
+                await email_service.send_welcome_email(...)
+                await email_service.send_learning_plan_ready(...)
+            outbox.results  # one bool per queued email
+        
+        Inside the block a send_* call returning True only means the email was queued; whether it
+        was delivered is known from `outbox.results` once the block has exited. Only use a batch
+        where the caller reads those results.
+        """
+        outbox = EmailBatch()
+        token = _outbox.set(outbox)
+        try:
+            yield outbox
+        finally:
+            _outbox.reset(token)
+        outbox.results = await self.send_emails(outbox.messages)
+    
     async def send_welcome_email(self, user_email: str, user_name: str) -> bool:
         """Send welcome email to new users."""
         subject = "Welcome to VEDYA - Your AI Learning Journey Begins! 🚀"
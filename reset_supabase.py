@@ -32,6 +32,7 @@ async def reset_supabase_database():
             'chat_messages',
             'chat_conversations', 
             'kanban_tasks',
+            'learning_plan_progress',
             'agent_runs',
             'user_progress',
             'lessons',
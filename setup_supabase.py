@@ -115,6 +115,33 @@ async def setup_supabase_database():
         await conn.execute("ALTER TABLE learning_plans ADD COLUMN IF NOT EXISTS plan_data JSONB DEFAULT '{}'")
         print("✅ learning_plans.plan_data column added")
 
+        # Learning plan progress (hot, frequently-written; separate so heartbeats don't rewrite plan rows)
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS learning_plan_progress (
+                plan_id UUID PRIMARY KEY REFERENCES learning_plans(id) ON DELETE CASCADE,
+                time_spent_minutes INTEGER DEFAULT 0,
+                overall_progress INTEGER DEFAULT 0,
+                progress_data JSONB DEFAULT '{}',
+                updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+            ) WITH (fillfactor = 70)
+        """)
+        print("✅ Learning plan progress table created")
+        # Backfill from the legacy learning_plans progress columns (safe to re-run); the columns are
+        # added first so the SELECT also works on a fresh database
+        await conn.execute("ALTER TABLE learning_plans ADD COLUMN IF NOT EXISTS time_spent_minutes INTEGER DEFAULT 0")
+        await conn.execute("ALTER TABLE learning_plans ADD COLUMN IF NOT EXISTS overall_progress INTEGER DEFAULT 0")
+        await conn.execute("ALTER TABLE learning_plans ADD COLUMN IF NOT EXISTS progress_data JSONB DEFAULT '{}'")
+        await conn.execute("""
+            INSERT INTO learning_plan_progress (plan_id, time_spent_minutes, overall_progress, progress_data, updated_at)
+            SELECT id, COALESCE(time_spent_minutes, 0), COALESCE(overall_progress, 0),
+                   COALESCE(progress_data, '{}'::jsonb), updated_at
+            FROM learning_plans
+            WHERE COALESCE(time_spent_minutes, 0) <> 0 OR COALESCE(overall_progress, 0) <> 0
+               OR COALESCE(progress_data, '{}'::jsonb) <> '{}'::jsonb
+            ON CONFLICT (plan_id) DO NOTHING
+        """)
+        print("✅ Learning plan progress backfilled")
+
         # App settings (e.g. configurable plan-ready message)
         await conn.execute("""
             CREATE TABLE IF NOT EXISTS app_settings (
@@ -49,6 +49,22 @@ ALTER TABLE learning_plans ADD COLUMN IF NOT EXISTS overall_progress INTEGER DEF
 ALTER TABLE learning_plans ADD COLUMN IF NOT EXISTS progress_data JSONB DEFAULT '{}';
 CREATE INDEX IF NOT EXISTS idx_learning_plans_user_id ON learning_plans(user_id);
 
+-- Learning plan progress (hot, frequently-written). Kept out of learning_plans so progress heartbeats
+-- only rewrite this narrow row; fillfactor leaves room for HOT updates.
+CREATE TABLE IF NOT EXISTS learning_plan_progress (
+  plan_id UUID PRIMARY KEY REFERENCES learning_plans(id) ON DELETE CASCADE,
+  time_spent_minutes INTEGER DEFAULT 0,
+  overall_progress INTEGER DEFAULT 0,
+  progress_data JSONB DEFAULT '{}',
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+) WITH (fillfactor = 70);
+-- Backfill from the legacy learning_plans progress columns (safe to re-run)
+INSERT INTO learning_plan_progress (plan_id, time_spent_minutes, overall_progress, progress_data, updated_at)
+SELECT id, COALESCE(time_spent_minutes, 0), COALESCE(overall_progress, 0), COALESCE(progress_data, '{}'::jsonb), updated_at
+FROM learning_plans
+WHERE COALESCE(time_spent_minutes, 0) <> 0 OR COALESCE(overall_progress, 0) <> 0 OR COALESCE(progress_data, '{}'::jsonb) <> '{}'::jsonb
+ON CONFLICT (plan_id) DO NOTHING;
+
 -- App settings (e.g. plan-ready message). Run if using learning plan + dashboard config.
 CREATE TABLE IF NOT EXISTS app_settings (
   key VARCHAR(255) PRIMARY KEY,
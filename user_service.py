@@ -9,7 +9,10 @@ import asyncio
 import asyncpg
 import logging
 import json
-from typing import Optional, Dict, Any
+import orjson
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, AsyncIterator
 from urllib.parse import urlparse, urlunparse, quote
 from dotenv import load_dotenv
 from email_service import VedyaEmailService
@@ -21,6 +24,84 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Shared connection pool sizing; connections idle longer than this are recycled.
+# Behind PgBouncer (transaction mode) these are client-side slots, not Postgres backends.
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", str((os.cpu_count() or 1) * 2 + 1)))
+DB_POOL_MAX_INACTIVE_SECONDS = 600
+DB_POOL_MAX_QUERIES = 50000
+
+# asyncpg prepares and caches statements per connection, keyed by SQL text. Supabase's
+# transaction pooler cannot hold named prepared statements, so the default is 0 (off);
+# set DB_STATEMENT_CACHE_SIZE (e.g. 100) when connecting to Postgres directly.
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "0"))
+
+# clerk_user_id -> users.id never changes for a given user, so lookups can be cached
+USER_ID_CACHE_TTL_SECONDS = 300
+
+# App settings change rarely but are read on every chat turn
+APP_SETTING_CACHE_TTL_SECONDS = 30
+
+# Recently-missing (plan_id, clerk_user_id) lookups are answered without a query for a short window
+PLAN_MISS_CACHE_TTL_SECONDS = 10
+PLAN_MISS_CACHE_MAX_ENTRIES = 1024
+
+
+def _encode_jsonb(value: Any) -> bytes:
+    # Binary jsonb wire format is a version byte (1) followed by the JSON text
+    return b"\x01" + orjson.dumps(value)
+
+
+def _decode_jsonb(data: bytes) -> Any:
+    return orjson.loads(data[1:])
+
+
+async def _init_connection(conn) -> None:
+    """Per-connection pool setup: decode/encode json and jsonb columns with orjson instead of text + json.loads."""
+    await conn.set_type_codec(
+        "jsonb", encoder=_encode_jsonb, decoder=_decode_jsonb, schema="pg_catalog", format="binary"
+    )
+    await conn.set_type_codec(
+        "json", encoder=orjson.dumps, decoder=orjson.loads, schema="pg_catalog", format="binary"
+    )
+
+
+def _build_progress_update_sql() -> Dict[int, str]:
+    """
+    Precompute the progress upsert for every non-empty combination of progress fields.
+    Key bits: 1 = time_spent_minutes, 2 = overall_progress, 4 = progress_data. Params are
+    numbered in that order, followed by plan id and clerk_user_id (ownership via the join).
+    Progress lives in the narrow learning_plan_progress table so heartbeat writes do not
+    rewrite the plan row. RETURNING tells the caller whether the plan matched without a second query.
+    """
+    columns = (
+        (1, "time_spent_minutes", "${}"),
+        (2, "overall_progress", "${}"),
+        (4, "progress_data", "${}::jsonb"),
+    )
+    statements = {}
+    for key in range(1, 8):
+        names = []
+        values = []
+        n = 1
+        for bit, name, placeholder in columns:
+            if key & bit:
+                names.append(name)
+                values.append(placeholder.format(n))
+                n += 1
+        sets = [f"{name} = EXCLUDED.{name}" for name in names] + ["updated_at = NOW()"]
+        statements[key] = (
+            f"INSERT INTO learning_plan_progress (plan_id, {', '.join(names)}, updated_at) "
+            f"SELECT lp.id, {', '.join(values)}, NOW() FROM learning_plans lp "
+            f"JOIN users u ON u.id = lp.user_id WHERE lp.id = ${n}::uuid AND u.clerk_user_id = ${n + 1} "
+            f"ON CONFLICT (plan_id) DO UPDATE SET {', '.join(sets)} "
+            "RETURNING plan_id"
+        )
+    return statements
+
+
+_PROGRESS_UPDATE_SQL = _build_progress_update_sql()
+
 
 def _normalize_database_url(url: str) -> str:
     """
@@ -54,13 +135,55 @@ class UserService:
         raw_url = os.getenv("DATABASE_URL")
         self.database_url = _normalize_database_url(raw_url) if raw_url else None
         self.email_service = VedyaEmailService()
+        self._id_cache: Dict[str, tuple] = {}
+        self._settings_cache: Dict[str, tuple] = {}
+        self._plan_miss_cache: "OrderedDict[tuple, float]" = OrderedDict()
+        self._schema_ready = False
+        self._pool: Optional[asyncpg.Pool] = None
+        self._pool_lock = asyncio.Lock()
         
         if not self.database_url:
             raise ValueError("DATABASE_URL not found in environment variables")
     
-    async def get_db_connection(self):
-        """Get database connection with Supabase-compatible settings."""
-        return await asyncpg.connect(self.database_url, statement_cache_size=0)
+    async def get_pool(self) -> asyncpg.Pool:
+        """Get the shared connection pool (created on first use) with Supabase-compatible settings."""
+        if self._pool is None:
+            async with self._pool_lock:
+                if self._pool is None:
+                    self._pool = await asyncpg.create_pool(
+                        self.database_url,
+                        min_size=DB_POOL_MIN_SIZE,
+                        max_size=DB_POOL_MAX_SIZE,
+                        max_inactive_connection_lifetime=DB_POOL_MAX_INACTIVE_SECONDS,
+                        max_queries=DB_POOL_MAX_QUERIES,
+                        statement_cache_size=DB_STATEMENT_CACHE_SIZE,
+                        init=_init_connection,
+                    )
+        return self._pool
+
+    async def close(self) -> None:
+        """Close the shared connection pool."""
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    async def _get_user_id(self, clerk_user_id: str, conn=None):
+        """Resolve clerk_user_id to the internal users.id, served from a short TTL cache when possible.
+        Pass the caller's already-acquired conn so a cache miss reuses it instead of acquiring a second one."""
+        if not clerk_user_id:
+            return None
+        cached = self._id_cache.get(clerk_user_id)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+        if conn is not None:
+            user_id = await conn.fetchval("SELECT id FROM users WHERE clerk_user_id = $1", clerk_user_id)
+        else:
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                user_id = await conn.fetchval("SELECT id FROM users WHERE clerk_user_id = $1", clerk_user_id)
+        if user_id is not None:
+            self._id_cache[clerk_user_id] = (user_id, time.monotonic() + USER_ID_CACHE_TTL_SECONDS)
+        return user_id
     
     async def create_user_from_clerk(self, clerk_user_id: str, email: str, name: str = None) -> Dict[str, Any]:
         """
@@ -68,31 +191,37 @@ class UserService:
         This should be called when a user signs up via Clerk.
         """
         try:
-            conn = await self.get_db_connection()
-            
-            # Check if user already exists
-            existing_user = await conn.fetchrow(
-                "SELECT * FROM users WHERE clerk_user_id = $1 OR email = $2",
-                clerk_user_id, email
-            )
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                # Check if user already exists: two single-column lookups so each can use its
+                # unique index (an OR across columns tends to degrade to a bitmap-OR or seq scan)
+                existing_id = await conn.fetchval(
+                    "SELECT id FROM users WHERE clerk_user_id = $1",
+                    clerk_user_id
+                )
+                if existing_id is None:
+                    existing_id = await conn.fetchval(
+                        "SELECT id FROM users WHERE email = $1",
+                        email
+                    )
+                
+                if existing_id is None:
+                    # Create new user
+                    user_id = await conn.fetchval("""
+                        INSERT INTO users (clerk_user_id, email, name, preferences)
+                        VALUES ($1, $2, $3, $4)
+                        RETURNING id
+                    """, clerk_user_id, email, name, {})
             
-            if existing_user:
+            if existing_id is not None:
                 logger.info(f"User already exists: {email}")
-                await conn.close()
                 return {
                     "success": True,
-                    "user_id": str(existing_user["id"]),
+                    "user_id": str(existing_id),
                     "message": "User already exists"
                 }
             
-            # Create new user
-            user_id = await conn.fetchval("""
-                INSERT INTO users (clerk_user_id, email, name, preferences)
-                VALUES ($1, $2, $3, $4)
-                RETURNING id
-            """, clerk_user_id, email, name, json.dumps({}))
-            
-            await conn.close()
+            self._id_cache[clerk_user_id] = (user_id, time.monotonic() + USER_ID_CACHE_TTL_SECONDS)
             
             # Send welcome email
             try:
@@ -119,22 +248,20 @@ class UserService:
     async def get_user_by_clerk_id(self, clerk_user_id: str) -> Optional[Dict[str, Any]]:
         """Get user by Clerk user ID. Prefer onboarding full_name as name when present."""
         try:
-            conn = await self.get_db_connection()
-            
-            user = await conn.fetchrow(
-                "SELECT * FROM users WHERE clerk_user_id = $1",
-                clerk_user_id
-            )
-            if not user:
-                await conn.close()
-                return None
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                user = await conn.fetchrow(
+                    "SELECT * FROM users WHERE clerk_user_id = $1",
+                    clerk_user_id
+                )
+                if not user:
+                    return None
+                onboarding = await conn.fetchrow(
+                    "SELECT full_name FROM user_onboarding WHERE user_id = $1",
+                    user["id"]
+                )
 
             row = dict(user)
-            onboarding = await conn.fetchrow(
-                "SELECT full_name FROM user_onboarding WHERE user_id = $1",
-                user["id"]
-            )
-            await conn.close()
             if onboarding and (onboarding.get("full_name") or "").strip():
                 row["name"] = (onboarding["full_name"] or "").strip()
             return row
@@ -146,14 +273,12 @@ class UserService:
     async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         """Get user by email address."""
         try:
-            conn = await self.get_db_connection()
-            
-            user = await conn.fetchrow(
-                "SELECT * FROM users WHERE email = $1",
-                email
-            )
-            
-            await conn.close()
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                user = await conn.fetchrow(
+                    "SELECT * FROM users WHERE email = $1",
+                    email
+                )
             
             if user:
                 return dict(user)
@@ -166,15 +291,13 @@ class UserService:
     async def update_user_preferences(self, user_id: str, preferences: Dict[str, Any]) -> bool:
         """Update user preferences."""
         try:
-            conn = await self.get_db_connection()
-            
-            await conn.execute("""
-                UPDATE users 
-                SET preferences = $1, updated_at = NOW()
-                WHERE id = $2
-            """, json.dumps(preferences), user_id)
-            
-            await conn.close()
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                await conn.execute("""
+                    UPDATE users 
+                    SET preferences = $1, updated_at = NOW()
+                    WHERE id = $2
+                """, preferences or {}, user_id)
             
             logger.info(f"Updated preferences for user {user_id}")
             return True
@@ -187,9 +310,9 @@ class UserService:
         """Send learning plan ready notification to user."""
         try:
             # Get user info
-            conn = await self.get_db_connection()
-            user = await conn.fetchrow("SELECT email, name FROM users WHERE id = $1", user_id)
-            await conn.close()
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                user = await conn.fetchrow("SELECT email, name FROM users WHERE id = $1", user_id)
             
             if not user:
                 logger.error(f"User not found: {user_id}")
@@ -214,9 +337,9 @@ class UserService:
         """Send progress milestone notification to user."""
         try:
             # Get user info
-            conn = await self.get_db_connection()
-            user = await conn.fetchrow("SELECT email, name FROM users WHERE id = $1", user_id)
-            await conn.close()
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                user = await conn.fetchrow("SELECT email, name FROM users WHERE id = $1", user_id)
             
             if not user:
                 logger.error(f"User not found: {user_id}")
@@ -241,9 +364,9 @@ class UserService:
         """Send daily summary notification to user."""
         try:
             # Get user info
-            conn = await self.get_db_connection()
-            user = await conn.fetchrow("SELECT email, name FROM users WHERE id = $1", user_id)
-            await conn.close()
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                user = await conn.fetchrow("SELECT email, name FROM users WHERE id = $1", user_id)
             
             if not user:
                 logger.error(f"User not found: {user_id}")
@@ -267,9 +390,9 @@ class UserService:
         """Send weekly report notification to user."""
         try:
             # Get user info
-            conn = await self.get_db_connection()
-            user = await conn.fetchrow("SELECT email, name FROM users WHERE id = $1", user_id)
-            await conn.close()
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                user = await conn.fetchrow("SELECT email, name FROM users WHERE id = $1", user_id)
             
             if not user:
                 logger.error(f"User not found: {user_id}")
@@ -288,20 +411,61 @@ class UserService:
         except Exception as e:
             logger.error(f"Failed to send weekly report: {str(e)}")
             return False
-    
+
+    async def send_weekly_reports(self, user_ids: List[str], reports_by_id: Dict[str, Dict[str, Any]]) -> Dict[str, bool]:
+        """Send weekly reports to many users: one user lookup and one SMTP session for the whole batch.
+        Returns a map of user_id -> delivered."""
+        results = {str(uid): False for uid in user_ids}
+        if not user_ids:
+            return results
+        try:
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                users = await conn.fetch(
+                    "SELECT id, email, name FROM users WHERE id = ANY($1::uuid[])",
+                    list(user_ids),
+                )
+        except Exception as e:
+            logger.error(f"Failed to load users for weekly reports: {str(e)}")
+            return results
+
+        missing = set(results) - {str(u["id"]) for u in users}
+        for uid in missing:
+            logger.error(f"User not found: {uid}")
+
+        # Render every report into one batch; the SMTP handshake and sends then run once, off the event loop
+        queued = []
+        async with self.email_service.batch() as outbox:
+            for u in users:
+                try:
+                    ok = await self.email_service.send_weekly_report(
+                        u["email"],
+                        u["name"] or "Learner",
+                        reports_by_id.get(str(u["id"]), {}),
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to send weekly report to {u['email']}: {str(e)}")
+                    ok = False
+                queued.append(ok)
+        # True above only means queued; delivery results are known once the batch has flushed
+        delivered = iter(outbox.results)
+        for u, ok in zip(users, queued):
+            results[str(u["id"])] = next(delivered) if ok else False
+        logger.info(f"Weekly reports sent: {sum(results.values())}/{len(results)}")
+        return results
+
     async def get_onboarding_status(self, clerk_user_id: str) -> Dict[str, Any]:
         """Check if user has completed onboarding. Returns { completed: bool, data?: ... }."""
         try:
-            conn = await self.get_db_connection()
-            user = await conn.fetchrow("SELECT id FROM users WHERE clerk_user_id = $1", clerk_user_id)
-            if not user:
-                await conn.close()
-                return {"completed": False}
-            row = await conn.fetchrow(
-                "SELECT * FROM user_onboarding WHERE user_id = $1",
-                user["id"]
-            )
-            await conn.close()
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                user_id = await self._get_user_id(clerk_user_id, conn)
+                if not user_id:
+                    return {"completed": False}
+                row = await conn.fetchrow(
+                    "SELECT * FROM user_onboarding WHERE user_id = $1",
+                    user_id
+                )
             if not row:
                 return {"completed": False}
             return {
@@ -319,25 +483,20 @@ class UserService:
     async def get_onboarding_data(self, clerk_user_id: str) -> Optional[Dict[str, Any]]:
         """Get full onboarding record for the user (for settings/edit)."""
         try:
-            conn = await self.get_db_connection()
-            user = await conn.fetchrow("SELECT id FROM users WHERE clerk_user_id = $1", clerk_user_id)
-            if not user:
-                await conn.close()
-                return None
-            row = await conn.fetchrow(
-                "SELECT full_name, address, gender, country, age, languages_to_learn, educational_status FROM user_onboarding WHERE user_id = $1",
-                user["id"]
-            )
-            await conn.close()
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                user_id = await self._get_user_id(clerk_user_id, conn)
+                if not user_id:
+                    return None
+                row = await conn.fetchrow(
+                    "SELECT full_name, address, gender, country, age, languages_to_learn, educational_status FROM user_onboarding WHERE user_id = $1",
+                    user_id
+                )
             if not row:
                 return None
             data = dict(row)
-            if isinstance(data.get("languages_to_learn"), str):
-                try:
-                    data["languages_to_learn"] = json.loads(data["languages_to_learn"])
-                except Exception:
-                    data["languages_to_learn"] = []
-            if data.get("languages_to_learn") is None:
+            # languages_to_learn is jsonb, already decoded via the pool's orjson codec
+            if data["languages_to_learn"] is None:
                 data["languages_to_learn"] = []
             return data
         except Exception as e:
@@ -350,12 +509,6 @@ class UserService:
         data: full_name, address, gender, country, age, languages_to_learn (list), educational_status
         """
         try:
-            conn = await self.get_db_connection()
-            user = await conn.fetchrow("SELECT id FROM users WHERE clerk_user_id = $1", clerk_user_id)
-            if not user:
-                await conn.close()
-                return {"success": False, "error": "User not found. Please complete sign-in first."}
-            user_id = user["id"]
             languages = data.get("languages_to_learn") or []
             if isinstance(languages, str):
                 try:
@@ -364,41 +517,44 @@ class UserService:
                     languages = [languages]
             if not isinstance(languages, list):
                 languages = []
-            languages_json = json.dumps(languages)
-            await conn.execute("""
-                INSERT INTO user_onboarding (
-                    user_id, full_name, address, gender, country, age,
-                    languages_to_learn, educational_status, completed_at, updated_at
-                )
-                VALUES ($1, $2, $3, $4, $5, $6, $7::jsonb, $8, NOW(), NOW())
-                ON CONFLICT (user_id) DO UPDATE SET
-                    full_name = EXCLUDED.full_name,
-                    address = EXCLUDED.address,
-                    gender = EXCLUDED.gender,
-                    country = EXCLUDED.country,
-                    age = EXCLUDED.age,
-                    languages_to_learn = EXCLUDED.languages_to_learn,
-                    educational_status = EXCLUDED.educational_status,
-                    completed_at = NOW(),
-                    updated_at = NOW()
-            """,
-                user_id,
-                data.get("full_name") or "",
-                data.get("address") or "",
-                data.get("gender") or "",
-                data.get("country") or "",
-                int(data.get("age")) if data.get("age") is not None and str(data.get("age")).strip() != "" else None,
-                languages_json,
-                data.get("educational_status") or ""
-            )
             full_name = (data.get("full_name") or "").strip()
-            if full_name:
-                await conn.execute(
-                    "UPDATE users SET name = $1, updated_at = NOW() WHERE id = $2",
-                    full_name,
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                user_id = await self._get_user_id(clerk_user_id, conn)
+                if not user_id:
+                    return {"success": False, "error": "User not found. Please complete sign-in first."}
+                await conn.execute("""
+                    INSERT INTO user_onboarding (
+                        user_id, full_name, address, gender, country, age,
+                        languages_to_learn, educational_status, completed_at, updated_at
+                    )
+                    VALUES ($1, $2, $3, $4, $5, $6, $7::jsonb, $8, NOW(), NOW())
+                    ON CONFLICT (user_id) DO UPDATE SET
+                        full_name = EXCLUDED.full_name,
+                        address = EXCLUDED.address,
+                        gender = EXCLUDED.gender,
+                        country = EXCLUDED.country,
+                        age = EXCLUDED.age,
+                        languages_to_learn = EXCLUDED.languages_to_learn,
+                        educational_status = EXCLUDED.educational_status,
+                        completed_at = NOW(),
+                        updated_at = NOW()
+                """,
                     user_id,
+                    data.get("full_name") or "",
+                    data.get("address") or "",
+                    data.get("gender") or "",
+                    data.get("country") or "",
+                    int(data.get("age")) if data.get("age") is not None and str(data.get("age")).strip() != "" else None,
+                    languages,
+                    data.get("educational_status") or ""
                 )
-            await conn.close()
+                if full_name:
+                    await conn.execute(
+                        "UPDATE users SET name = $1, updated_at = NOW() WHERE id = $2",
+                        full_name,
+                        user_id,
+                    )
             logger.info(f"Onboarding saved for user {user_id}")
             return {"success": True}
         except Exception as e:
@@ -408,21 +564,20 @@ class UserService:
     async def create_chat_conversation(self, clerk_user_id: str) -> Optional[str]:
         """Create a chat conversation for the user. Returns conversation id (session_id) or None."""
         try:
-            user = await self.get_user_by_clerk_id(clerk_user_id)
-            if not user or not user.get("id"):
-                logger.warning("create_chat_conversation: user not found for clerk_user_id")
-                return None
-            user_id = user["id"]
-            conn = await self.get_db_connection()
-            conversation_id = await conn.fetchval(
-                """
-                INSERT INTO chat_conversations (user_id)
-                VALUES ($1)
-                RETURNING id
-                """,
-                user_id,
-            )
-            await conn.close()
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                user_id = await self._get_user_id(clerk_user_id, conn)
+                if not user_id:
+                    logger.warning("create_chat_conversation: user not found for clerk_user_id")
+                    return None
+                conversation_id = await conn.fetchval(
+                    """
+                    INSERT INTO chat_conversations (user_id)
+                    VALUES ($1)
+                    RETURNING id
+                    """,
+                    user_id,
+                )
             return str(conversation_id) if conversation_id else None
         except Exception as e:
             logger.error(f"Failed to create chat conversation: {e}")
@@ -431,21 +586,21 @@ class UserService:
     async def save_chat_message(self, conversation_id: str, role: str, content: str) -> bool:
         """Save a chat message (user or assistant) with timestamp. Returns True on success."""
         try:
-            conn = await self.get_db_connection()
-            await conn.execute(
-                """
-                INSERT INTO chat_messages (conversation_id, role, content)
-                VALUES ($1::uuid, $2, $3)
-                """,
-                conversation_id,
-                role,
-                content,
-            )
-            await conn.execute(
-                "UPDATE chat_conversations SET updated_at = NOW() WHERE id = $1::uuid",
-                conversation_id,
-            )
-            await conn.close()
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                await conn.execute(
+                    """
+                    INSERT INTO chat_messages (conversation_id, role, content)
+                    VALUES ($1::uuid, $2, $3)
+                    """,
+                    conversation_id,
+                    role,
+                    content,
+                )
+                await conn.execute(
+                    "UPDATE chat_conversations SET updated_at = NOW() WHERE id = $1::uuid",
+                    conversation_id,
+                )
             return True
         except Exception as e:
             logger.error(f"Failed to save chat message: {e}")
@@ -454,36 +609,38 @@ class UserService:
     async def list_chat_conversations(self, clerk_user_id: str) -> list:
         """List chat conversations that have at least one message, most recent first. Returns id, created_at, updated_at, topic (first user message truncated, or first message)."""
         try:
-            user = await self.get_user_by_clerk_id(clerk_user_id)
-            if not user or not user.get("id"):
-                return []
-            conn = await self.get_db_connection()
-            rows = await conn.fetch(
-                """
-                SELECT c.id, c.created_at, c.updated_at,
-                  COALESCE(
-                    (SELECT LEFT(TRIM(m.content), 56) FROM chat_messages m
-                     WHERE m.conversation_id = c.id AND m.role = 'user'
-                     ORDER BY m.created_at ASC LIMIT 1),
-                    (SELECT LEFT(TRIM(m.content), 56) FROM chat_messages m
-                     WHERE m.conversation_id = c.id
-                     ORDER BY m.created_at ASC LIMIT 1)
-                  ) AS topic
-                FROM chat_conversations c
-                WHERE c.user_id = $1
-                  AND EXISTS (SELECT 1 FROM chat_messages m WHERE m.conversation_id = c.id AND m.role = 'user')
-                ORDER BY c.updated_at DESC NULLS LAST, c.created_at DESC
-                LIMIT 50
-                """,
-                user["id"],
-            )
-            await conn.close()
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                user_id = await self._get_user_id(clerk_user_id, conn)
+                if not user_id:
+                    return []
+                rows = await conn.fetch(
+                    """
+                    SELECT c.id, c.created_at, c.updated_at,
+                      COALESCE(
+                        (SELECT LEFT(TRIM(m.content), 56) FROM chat_messages m
+                         WHERE m.conversation_id = c.id AND m.role = 'user'
+                         ORDER BY m.created_at ASC LIMIT 1),
+                        (SELECT LEFT(TRIM(m.content), 56) FROM chat_messages m
+                         WHERE m.conversation_id = c.id
+                         ORDER BY m.created_at ASC LIMIT 1)
+                      ) AS topic
+                    FROM chat_conversations c
+                    WHERE c.user_id = $1
+                      AND EXISTS (SELECT 1 FROM chat_messages m WHERE m.conversation_id = c.id AND m.role = 'user')
+                    ORDER BY c.updated_at DESC NULLS LAST, c.created_at DESC
+                    LIMIT 50
+                    """,
+                    user_id,
+                )
+            # Positional access matches the SELECT column order: id, created_at, updated_at, topic.
+            # Timestamps stay datetime and are formatted by the ORJSONResponse layer.
             return [
                 {
-                    "id": str(r["id"]),
-                    "created_at": r["created_at"].isoformat() if r.get("created_at") else None,
-                    "updated_at": r["updated_at"].isoformat() if r.get("updated_at") else None,
-                    "topic": (r["topic"] or "").strip() or "Chat",
+                    "id": str(r[0]),
+                    "created_at": r[1],
+                    "updated_at": r[2],
+                    "topic": (r[3] or "").strip() or "Chat",
                 }
                 for r in rows
             ]
@@ -494,22 +651,24 @@ class UserService:
     async def get_chat_messages(self, conversation_id: str) -> list:
         """Get messages for a conversation, oldest first. Returns list of dicts with role, content, created_at."""
         try:
-            conn = await self.get_db_connection()
-            rows = await conn.fetch(
-                """
-                SELECT role, content, created_at
-                FROM chat_messages
-                WHERE conversation_id = $1::uuid
-                ORDER BY created_at ASC
-                """,
-                conversation_id,
-            )
-            await conn.close()
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                rows = await conn.fetch(
+                    """
+                    SELECT role, content, created_at
+                    FROM chat_messages
+                    WHERE conversation_id = $1::uuid
+                    ORDER BY created_at ASC
+                    """,
+                    conversation_id,
+                )
+            # Positional access matches the SELECT column order: role, content, created_at.
+            # Timestamps stay datetime and are formatted by the ORJSONResponse layer.
             return [
                 {
-                    "role": r["role"],
-                    "content": r["content"] or "",
-                    "created_at": r["created_at"].isoformat() if r.get("created_at") else None,
+                    "role": r[0],
+                    "content": r[1] or "",
+                    "created_at": r[2],
                 }
                 for r in rows
             ]
@@ -520,17 +679,17 @@ class UserService:
     async def delete_chat_conversation(self, conversation_id: str, clerk_user_id: str) -> bool:
         """Delete a chat conversation and its messages if it belongs to the user. Returns True if deleted."""
         try:
-            user = await self.get_user_by_clerk_id(clerk_user_id)
-            if not user or not user.get("id"):
-                return False
-            conn = await self.get_db_connection()
-            result = await conn.execute(
-                "DELETE FROM chat_conversations WHERE id = $1::uuid AND user_id = $2::uuid",
-                conversation_id,
-                user["id"],
-            )
-            await conn.close()
-            return result.lower() == "delete 1"
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                user_id = await self._get_user_id(clerk_user_id, conn)
+                if not user_id:
+                    return False
+                deleted_id = await conn.fetchval(
+                    "DELETE FROM chat_conversations WHERE id = $1::uuid AND user_id = $2::uuid RETURNING id",
+                    conversation_id,
+                    user_id,
+                )
+            return deleted_id is not None
         except Exception as e:
             logger.error("Failed to delete chat conversation: %s", e)
             return False
@@ -538,12 +697,12 @@ class UserService:
     async def get_user_id_by_conversation_id(self, conversation_id: str) -> Optional[str]:
         """Get user_id (UUID string) for a chat conversation. Returns None if not found."""
         try:
-            conn = await self.get_db_connection()
-            row = await conn.fetchrow(
-                "SELECT user_id FROM chat_conversations WHERE id = $1::uuid",
-                conversation_id,
-            )
-            await conn.close()
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                row = await conn.fetchrow(
+                    "SELECT user_id FROM chat_conversations WHERE id = $1::uuid",
+                    conversation_id,
+                )
             if row and row.get("user_id"):
                 return str(row["user_id"])
             return None
@@ -561,20 +720,21 @@ class UserService:
             title = plan_dict.get("title") or "Learning Plan"
             summary = plan_dict.get("description") or plan_dict.get("summary") or ""
             goals = plan_dict.get("learning_outcomes") or []
-            conn = await self.get_db_connection()
-            await self._ensure_learning_plans_table(conn)
-            await conn.execute(
-                """
-                INSERT INTO learning_plans (user_id, title, summary, goals, status, plan_data)
-                VALUES ($1::uuid, $2, $3, $4::jsonb, 'active', $5::jsonb)
-                """,
-                user_id,
-                title,
-                summary,
-                json.dumps(goals),
-                json.dumps(plan_dict),
-            )
-            await conn.close()
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                if not self._schema_ready:
+                    await self._ensure_learning_plans_table(conn)
+                await conn.execute(
+                    """
+                    INSERT INTO learning_plans (user_id, title, summary, goals, status, plan_data)
+                    VALUES ($1::uuid, $2, $3, $4::jsonb, 'active', $5::jsonb)
+                    """,
+                    user_id,
+                    title,
+                    summary,
+                    goals,
+                    plan_dict,
+                )
             logger.info("Saved learning plan for user %s", user_id)
             return True
         except Exception as e:
@@ -584,28 +744,28 @@ class UserService:
     async def save_learning_plan_for_clerk_user(self, clerk_user_id: str, plan_dict: Dict[str, Any]) -> bool:
         """Save a learning plan for the user identified by clerk_user_id (fallback when conversation id is not in our DB)."""
         try:
-            user = await self.get_user_by_clerk_id(clerk_user_id)
-            if not user or not user.get("id"):
-                logger.warning("save_learning_plan_for_clerk_user: user not found for clerk_user_id (user may not be registered)")
-                return False
-            user_id = user["id"]
             title = plan_dict.get("title") or "Learning Plan"
             summary = plan_dict.get("description") or plan_dict.get("summary") or ""
             goals = plan_dict.get("learning_outcomes") or []
-            conn = await self.get_db_connection()
-            await self._ensure_learning_plans_table(conn)
-            await conn.execute(
-                """
-                INSERT INTO learning_plans (user_id, title, summary, goals, status, plan_data)
-                VALUES ($1::uuid, $2, $3, $4::jsonb, 'active', $5::jsonb)
-                """,
-                user_id,
-                title,
-                summary,
-                json.dumps(goals),
-                json.dumps(plan_dict),
-            )
-            await conn.close()
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                user_id = await self._get_user_id(clerk_user_id, conn)
+                if not user_id:
+                    logger.warning("save_learning_plan_for_clerk_user: user not found for clerk_user_id (user may not be registered)")
+                    return False
+                if not self._schema_ready:
+                    await self._ensure_learning_plans_table(conn)
+                await conn.execute(
+                    """
+                    INSERT INTO learning_plans (user_id, title, summary, goals, status, plan_data)
+                    VALUES ($1::uuid, $2, $3, $4::jsonb, 'active', $5::jsonb)
+                    """,
+                    user_id,
+                    title,
+                    summary,
+                    goals,
+                    plan_dict,
+                )
             logger.info("Saved learning plan for clerk user (plan title: %s)", title)
             return True
         except Exception as e:
@@ -613,7 +773,8 @@ class UserService:
             return False
 
     async def _ensure_learning_plans_table(self, conn) -> None:
-        """Create learning_plans table and plan_data column if they do not exist."""
+        """Create learning_plans (plus plan_data column) and learning_plan_progress tables if they do not exist.
+        Write paths only run this until it has succeeded once per process (tracked by _schema_ready)."""
         await conn.execute('CREATE EXTENSION IF NOT EXISTS "uuid-ossp"')
         await conn.execute("""
             CREATE TABLE IF NOT EXISTS learning_plans (
@@ -631,147 +792,152 @@ class UserService:
         await conn.execute("ALTER TABLE learning_plans ADD COLUMN IF NOT EXISTS time_spent_minutes INTEGER DEFAULT 0")
         await conn.execute("ALTER TABLE learning_plans ADD COLUMN IF NOT EXISTS overall_progress INTEGER DEFAULT 0")
         await conn.execute("ALTER TABLE learning_plans ADD COLUMN IF NOT EXISTS progress_data JSONB DEFAULT '{}'")
+        # Frequently-written progress lives in its own narrow table; fillfactor leaves room for HOT updates
+        if await conn.fetchval("SELECT to_regclass('learning_plan_progress') IS NULL"):
+            await conn.execute("""
+                CREATE TABLE IF NOT EXISTS learning_plan_progress (
+                    plan_id UUID PRIMARY KEY REFERENCES learning_plans(id) ON DELETE CASCADE,
+                    time_spent_minutes INTEGER DEFAULT 0,
+                    overall_progress INTEGER DEFAULT 0,
+                    progress_data JSONB DEFAULT '{}',
+                    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+                ) WITH (fillfactor = 70)
+            """)
+            # One-time backfill from the legacy learning_plans progress columns
+            await conn.execute("""
+                INSERT INTO learning_plan_progress (plan_id, time_spent_minutes, overall_progress, progress_data, updated_at)
+                SELECT id, COALESCE(time_spent_minutes, 0), COALESCE(overall_progress, 0),
+                       COALESCE(progress_data, '{}'::jsonb), updated_at
+                FROM learning_plans
+                WHERE COALESCE(time_spent_minutes, 0) <> 0 OR COALESCE(overall_progress, 0) <> 0
+                   OR COALESCE(progress_data, '{}'::jsonb) <> '{}'::jsonb
+                ON CONFLICT (plan_id) DO NOTHING
+            """)
+        self._schema_ready = True
 
     async def list_learning_plans(self, clerk_user_id: str) -> list:
         """List learning plans for the user, most recent first. Returns list of dicts with id, title, summary, status, plan_data, created_at."""
         try:
-            user = await self.get_user_by_clerk_id(clerk_user_id)
-            if not user or not user.get("id"):
-                logger.info("list_learning_plans: no user found for clerk_user_id=%s", clerk_user_id[:20] + "..." if len(clerk_user_id or "") > 20 else clerk_user_id)
-                return []
-            conn = await self.get_db_connection()
-            try:
-                rows = await conn.fetch(
-                """
-                SELECT id, title, summary, status, plan_data, created_at, updated_at,
-                       COALESCE(time_spent_minutes, 0) AS time_spent_minutes,
-                       COALESCE(overall_progress, 0) AS overall_progress,
-                       COALESCE(progress_data, '{}'::jsonb) AS progress_data
-                FROM learning_plans
-                WHERE user_id = $1
-                ORDER BY created_at DESC
-                LIMIT 50
-                """,
-                user["id"],
-            )
-            except Exception as table_err:
-                err_msg = str(table_err).lower()
-                if "learning_plans" in err_msg or "does not exist" in err_msg or "undefined_table" in err_msg or "column" in err_msg:
-                    await self._ensure_learning_plans_table(conn)
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                user_id = await self._get_user_id(clerk_user_id, conn)
+                if not user_id:
+                    logger.info("list_learning_plans: no user found for clerk_user_id=%s", clerk_user_id[:20] + "..." if len(clerk_user_id or "") > 20 else clerk_user_id)
+                    return []
+                try:
                     rows = await conn.fetch(
                         """
-                        SELECT id, title, summary, status, plan_data, created_at, updated_at,
-                               COALESCE(time_spent_minutes, 0) AS time_spent_minutes,
-                               COALESCE(overall_progress, 0) AS overall_progress,
-                               COALESCE(progress_data, '{}'::jsonb) AS progress_data
-                        FROM learning_plans
-                        WHERE user_id = $1
-                        ORDER BY created_at DESC
+                        SELECT lp.id, lp.title, lp.summary, lp.status, lp.plan_data, lp.created_at,
+                               GREATEST(lp.updated_at, p.updated_at) AS updated_at,
+                               COALESCE(p.time_spent_minutes, 0) AS time_spent_minutes,
+                               COALESCE(p.overall_progress, 0) AS overall_progress,
+                               COALESCE(p.progress_data, '{}'::jsonb) AS progress_data
+                        FROM learning_plans lp
+                        LEFT JOIN learning_plan_progress p ON p.plan_id = lp.id
+                        WHERE lp.user_id = $1
+                        ORDER BY lp.created_at DESC
                         LIMIT 50
                         """,
-                        user["id"],
+                        user_id,
                     )
-                else:
-                    await conn.close()
-                    raise
-            await conn.close()
-            out = []
-            for r in rows:
-                plan_data = r.get("plan_data")
-                if isinstance(plan_data, str):
-                    try:
-                        plan_data = json.loads(plan_data) if plan_data else {}
-                    except Exception:
-                        plan_data = {}
-                prog_data = r.get("progress_data")
-                if isinstance(prog_data, str):
-                    try:
-                        prog_data = json.loads(prog_data) if prog_data else {}
-                    except Exception:
-                        prog_data = {}
-                out.append({
-                    "id": str(r["id"]),
-                    "title": r.get("title") or "Learning Plan",
-                    "summary": r.get("summary") or "",
-                    "status": r.get("status") or "active",
-                    "plan_data": plan_data or {},
-                    "created_at": r["created_at"].isoformat() if r.get("created_at") else None,
-                    "updated_at": r["updated_at"].isoformat() if r.get("updated_at") else None,
-                    "time_spent_minutes": int(r.get("time_spent_minutes") or 0),
-                    "overall_progress": int(r.get("overall_progress") or 0),
-                    "progress_data": prog_data if isinstance(prog_data, dict) else {},
-                })
-            return out
+                except Exception as table_err:
+                    err_msg = str(table_err).lower()
+                    if "learning_plans" in err_msg or "does not exist" in err_msg or "undefined_table" in err_msg or "column" in err_msg:
+                        await self._ensure_learning_plans_table(conn)
+                        rows = await conn.fetch(
+                            """
+                            SELECT lp.id, lp.title, lp.summary, lp.status, lp.plan_data, lp.created_at,
+                                   GREATEST(lp.updated_at, p.updated_at) AS updated_at,
+                                   COALESCE(p.time_spent_minutes, 0) AS time_spent_minutes,
+                                   COALESCE(p.overall_progress, 0) AS overall_progress,
+                                   COALESCE(p.progress_data, '{}'::jsonb) AS progress_data
+                            FROM learning_plans lp
+                            LEFT JOIN learning_plan_progress p ON p.plan_id = lp.id
+                            WHERE lp.user_id = $1
+                            ORDER BY lp.created_at DESC
+                            LIMIT 50
+                            """,
+                            user_id,
+                        )
+                    else:
+                        raise
+            # Positional access matches the SELECT column order: id, title, summary, status, plan_data,
+            # created_at, updated_at, time_spent_minutes, overall_progress, progress_data.
+            # jsonb columns arrive already decoded via the pool's orjson codec; timestamps stay datetime
+            # and are formatted by the ORJSONResponse layer.
+            return [
+                {
+                    "id": str(r[0]),
+                    "title": r[1] or "Learning Plan",
+                    "summary": r[2] or "",
+                    "status": r[3] or "active",
+                    "plan_data": r[4] or {},
+                    "created_at": r[5],
+                    "updated_at": r[6],
+                    "time_spent_minutes": r[7] or 0,
+                    "overall_progress": r[8] or 0,
+                    "progress_data": r[9] if isinstance(r[9], dict) else {},
+                }
+                for r in rows
+            ]
         except Exception as e:
             logger.error("Failed to list learning plans: %s", e)
             return []
 
     async def get_learning_plan_by_id(self, plan_id: str, clerk_user_id: str) -> Optional[Dict[str, Any]]:
         """Get a single learning plan by id if it belongs to the user. Returns dict with id, title, summary, plan_data, etc."""
+        # Ownership is checked in the same round trip by joining users on clerk_user_id
+        sql = """
+            SELECT lp.id, lp.title, lp.summary, lp.status, lp.plan_data, lp.goals, lp.created_at,
+                   GREATEST(lp.updated_at, p.updated_at) AS updated_at,
+                   COALESCE(p.time_spent_minutes, 0) AS time_spent_minutes,
+                   COALESCE(p.overall_progress, 0) AS overall_progress,
+                   COALESCE(p.progress_data, '{}'::jsonb) AS progress_data
+            FROM learning_plans lp
+            JOIN users u ON u.id = lp.user_id
+            LEFT JOIN learning_plan_progress p ON p.plan_id = lp.id
+            WHERE lp.id = $1::uuid AND u.clerk_user_id = $2
+        """
         try:
-            user = await self.get_user_by_clerk_id(clerk_user_id)
-            if not user or not user.get("id"):
+            if not clerk_user_id:
                 return None
-            conn = await self.get_db_connection()
-            try:
-                row = await conn.fetchrow(
-                    """
-                    SELECT id, title, summary, status, plan_data, goals, created_at, updated_at,
-                           COALESCE(time_spent_minutes, 0) AS time_spent_minutes,
-                           COALESCE(overall_progress, 0) AS overall_progress,
-                           COALESCE(progress_data, '{}'::jsonb) AS progress_data
-                    FROM learning_plans
-                    WHERE id = $1::uuid AND user_id = $2::uuid
-                    """,
-                    plan_id,
-                    user["id"],
-                )
-            except Exception as fetch_err:
-                err_msg = str(fetch_err).lower()
-                if "column" in err_msg or "does not exist" in err_msg:
-                    await self._ensure_learning_plans_table(conn)
-                    row = await conn.fetchrow(
-                        """
-                        SELECT id, title, summary, status, plan_data, goals, created_at, updated_at,
-                               COALESCE(time_spent_minutes, 0) AS time_spent_minutes,
-                               COALESCE(overall_progress, 0) AS overall_progress,
-                               COALESCE(progress_data, '{}'::jsonb) AS progress_data
-                        FROM learning_plans
-                        WHERE id = $1::uuid AND user_id = $2::uuid
-                        """,
-                        plan_id,
-                        user["id"],
-                    )
-                else:
-                    await conn.close()
-                    raise
-            await conn.close()
+            miss_key = (plan_id, clerk_user_id)
+            miss_expires = self._plan_miss_cache.get(miss_key)
+            if miss_expires is not None:
+                if miss_expires > time.monotonic():
+                    return None
+                del self._plan_miss_cache[miss_key]
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                try:
+                    row = await conn.fetchrow(sql, plan_id, clerk_user_id)
+                except Exception as fetch_err:
+                    err_msg = str(fetch_err).lower()
+                    if "column" in err_msg or "does not exist" in err_msg:
+                        await self._ensure_learning_plans_table(conn)
+                        row = await conn.fetchrow(sql, plan_id, clerk_user_id)
+                    else:
+                        raise
             if not row:
+                self._plan_miss_cache[miss_key] = time.monotonic() + PLAN_MISS_CACHE_TTL_SECONDS
+                if len(self._plan_miss_cache) > PLAN_MISS_CACHE_MAX_ENTRIES:
+                    self._plan_miss_cache.popitem(last=False)
                 return None
-            plan_data = row.get("plan_data")
-            if isinstance(plan_data, str):
-                try:
-                    plan_data = json.loads(plan_data) if plan_data else {}
-                except Exception:
-                    plan_data = {}
-            prog_data = row.get("progress_data")
-            if isinstance(prog_data, str):
-                try:
-                    prog_data = json.loads(prog_data) if prog_data else {}
-                except Exception:
-                    prog_data = {}
+            # jsonb columns arrive already decoded via the pool's orjson codec; timestamps stay datetime
+            # and are formatted by the ORJSONResponse layer
             return {
                 "id": str(row["id"]),
                 "title": row.get("title") or "Learning Plan",
                 "summary": row.get("summary") or "",
                 "status": row.get("status") or "active",
-                "plan_data": plan_data or {},
+                # NULL (or non-object) jsonb columns read as empty dicts, as before the codec change
+                "plan_data": row["plan_data"] or {},
                 "goals": row.get("goals"),
-                "created_at": row["created_at"].isoformat() if row.get("created_at") else None,
-                "updated_at": row["updated_at"].isoformat() if row.get("updated_at") else None,
+                "created_at": row["created_at"],
+                "updated_at": row["updated_at"],
                 "time_spent_minutes": int(row.get("time_spent_minutes") or 0),
                 "overall_progress": int(row.get("overall_progress") or 0),
-                "progress_data": prog_data if isinstance(prog_data, dict) else {},
+                "progress_data": row["progress_data"] if isinstance(row["progress_data"], dict) else {},
             }
         except Exception as e:
             logger.error("Failed to get learning plan: %s", e)
@@ -785,69 +951,157 @@ class UserService:
         overall_progress: Optional[int] = None,
         progress_data: Optional[Dict[str, Any]] = None,
     ) -> bool:
-        """Update progress for a learning plan. Returns True if updated."""
+        """Update progress for a learning plan. Returns True if the plan exists, belongs to the user and was updated."""
         try:
-            user = await self.get_user_by_clerk_id(clerk_user_id)
-            if not user or not user.get("id"):
+            if not clerk_user_id:
                 return False
-            conn = await self.get_db_connection()
-            await self._ensure_learning_plans_table(conn)
-            updates = []
+            key = 0
             params = []
-            n = 1
             if time_spent_minutes is not None:
-                updates.append(f"time_spent_minutes = ${n}")
+                key |= 1
                 params.append(time_spent_minutes)
-                n += 1
             if overall_progress is not None:
-                updates.append(f"overall_progress = ${n}")
-                params.append(min(100, max(0, overall_progress)))
-                n += 1
+                key |= 2
+                params.append(0 if overall_progress < 0 else 100 if overall_progress > 100 else overall_progress)
             if progress_data is not None:
-                updates.append(f"progress_data = ${n}::jsonb")
-                params.append(json.dumps(progress_data))
-                n += 1
-            if not updates:
-                await conn.close()
+                key |= 4
+                params.append(progress_data)
+            if not key:
                 return True
-            updates.append("updated_at = NOW()")
-            params.extend([plan_id, user["id"]])
-            # WHERE uses $n and $n+1 (e.g. $4 and $5 when we have 3 SET params)
-            await conn.execute(
-                f"UPDATE learning_plans SET {', '.join(updates)} WHERE id = ${n}::uuid AND user_id = ${n + 1}::uuid",
-                *params,
-            )
-            await conn.close()
-            return True
+            params.append(plan_id)
+            params.append(clerk_user_id)
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                if not self._schema_ready:
+                    await self._ensure_learning_plans_table(conn)
+                updated_id = await conn.fetchval(_PROGRESS_UPDATE_SQL[key], *params)
+            if updated_id is not None:
+                self._plan_miss_cache.pop((plan_id, clerk_user_id), None)
+            return updated_id is not None
         except Exception as e:
             logger.error("Failed to update plan progress: %s", e)
             return False
 
+    async def update_plan_progress_patch(self, plan_id: str, clerk_user_id: str, patch: Dict[str, Any]) -> bool:
+        """Merge a partial progress_data update into the stored blob inside Postgres, so only the delta
+        is sent. null values are stripped from the merged result (set a key to None to remove it).
+        Returns True if the plan was updated."""
+        try:
+            if not clerk_user_id:
+                return False
+            if not patch:
+                return True
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                if not self._schema_ready:
+                    await self._ensure_learning_plans_table(conn)
+                updated_id = await conn.fetchval(
+                    """
+                    INSERT INTO learning_plan_progress (plan_id, progress_data, updated_at)
+                    SELECT lp.id, jsonb_strip_nulls($1::jsonb), NOW()
+                    FROM learning_plans lp
+                    JOIN users u ON u.id = lp.user_id
+                    WHERE lp.id = $2::uuid AND u.clerk_user_id = $3
+                    ON CONFLICT (plan_id) DO UPDATE SET
+                        progress_data = jsonb_strip_nulls(learning_plan_progress.progress_data || $1::jsonb),
+                        updated_at = NOW()
+                    RETURNING plan_id
+                    """,
+                    patch,
+                    plan_id,
+                    clerk_user_id,
+                )
+            if updated_id is not None:
+                self._plan_miss_cache.pop((plan_id, clerk_user_id), None)
+            return updated_id is not None
+        except Exception as e:
+            logger.error("Failed to patch plan progress: %s", e)
+            return False
+
+    async def update_plan_progress_bulk(
+        self,
+        clerk_user_id: str,
+        updates: List[tuple],
+    ) -> int:
+        """Update progress for many of the user's learning plans in one batch.
+        updates: (plan_id, time_spent_minutes, overall_progress, progress_data) tuples; None leaves a field unchanged.
+        Returns the number of plans updated; plan ids that are unknown or not the user's are skipped (0 on error)."""
+        if not updates:
+            return 0
+        try:
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                user_id = await self._get_user_id(clerk_user_id, conn)
+                if not user_id:
+                    return 0
+                args = [
+                    (
+                        time_spent,
+                        None if progress is None else 0 if progress < 0 else 100 if progress > 100 else progress,
+                        data,
+                        plan_id,
+                        user_id,
+                    )
+                    for plan_id, time_spent, progress, data in updates
+                ]
+                if not self._schema_ready:
+                    await self._ensure_learning_plans_table(conn)
+                async with conn.transaction():
+                    # executemany reports no row counts; the upsert writes exactly the user's matching plans
+                    updated = await conn.fetchval(
+                        "SELECT count(*) FROM learning_plans WHERE id = ANY($1::uuid[]) AND user_id = $2::uuid",
+                        [plan_id for plan_id, *_ in updates],
+                        user_id,
+                    )
+                    await conn.executemany(
+                        """
+                        INSERT INTO learning_plan_progress (plan_id, time_spent_minutes, overall_progress, progress_data, updated_at)
+                        SELECT lp.id, COALESCE($1::integer, 0), COALESCE($2::integer, 0), COALESCE($3::jsonb, '{}'::jsonb), NOW()
+                        FROM learning_plans lp
+                        WHERE lp.id = $4::uuid AND lp.user_id = $5::uuid
+                        ON CONFLICT (plan_id) DO UPDATE SET
+                            time_spent_minutes = COALESCE($1::integer, learning_plan_progress.time_spent_minutes),
+                            overall_progress = COALESCE($2::integer, learning_plan_progress.overall_progress),
+                            progress_data = COALESCE($3::jsonb, learning_plan_progress.progress_data),
+                            updated_at = NOW()
+                        """,
+                        args,
+                    )
+            return updated
+        except Exception as e:
+            logger.error("Failed to bulk update plan progress: %s", e)
+            return 0
+
     async def delete_learning_plan(self, plan_id: str, clerk_user_id: str) -> bool:
         """Delete a learning plan if it belongs to the user. Returns True if deleted."""
         try:
-            user = await self.get_user_by_clerk_id(clerk_user_id)
-            if not user or not user.get("id"):
+            if not clerk_user_id:
                 return False
-            conn = await self.get_db_connection()
-            result = await conn.execute(
-                "DELETE FROM learning_plans WHERE id = $1::uuid AND user_id = $2::uuid",
-                plan_id,
-                user["id"],
-            )
-            await conn.close()
-            return result and "DELETE 1" in result
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                deleted_id = await conn.fetchval(
+                    "DELETE FROM learning_plans WHERE id = $1::uuid AND user_id = (SELECT id FROM users WHERE clerk_user_id = $2) RETURNING id",
+                    plan_id,
+                    clerk_user_id,
+                )
+            if deleted_id is not None:
+                self._plan_miss_cache.pop((plan_id, clerk_user_id), None)
+            return deleted_id is not None
         except Exception as e:
             logger.error("Failed to delete learning plan: %s", e)
             return False
 
     async def get_app_setting(self, key: str) -> Optional[str]:
-        """Get an app-wide setting value by key. Returns None if not set."""
+        """Get an app-wide setting value by key. Returns None if not set. Served from a short TTL cache."""
+        cached = self._settings_cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
         try:
-            conn = await self.get_db_connection()
-            row = await conn.fetchrow("SELECT value FROM app_settings WHERE key = $1", key)
-            await conn.close()
-            return row["value"] if row and row.get("value") is not None else None
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                value = await conn.fetchval("SELECT value FROM app_settings WHERE key = $1", key)
+            self._settings_cache[key] = (time.monotonic() + APP_SETTING_CACHE_TTL_SECONDS, value)
+            return value
         except Exception as e:
             logger.error("Failed to get app setting %s: %s", key, e)
             return None
@@ -855,42 +1109,93 @@ class UserService:
     async def set_app_setting(self, key: str, value: str) -> bool:
         """Set an app-wide setting. Returns True on success."""
         try:
-            conn = await self.get_db_connection()
-            await conn.execute(
-                """
-                INSERT INTO app_settings (key, value, updated_at)
-                VALUES ($1, $2, NOW())
-                ON CONFLICT (key) DO UPDATE SET value = $2, updated_at = NOW()
-                """,
-                key,
-                value,
-            )
-            await conn.close()
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                await conn.execute(
+                    """
+                    INSERT INTO app_settings (key, value, updated_at)
+                    VALUES ($1, $2, NOW())
+                    ON CONFLICT (key) DO UPDATE SET value = $2, updated_at = NOW()
+                    """,
+                    key,
+                    value,
+                )
+            self._settings_cache.pop(key, None)
             return True
         except Exception as e:
             logger.error("Failed to set app setting %s: %s", key, e)
             return False
 
+    async def set_app_settings_bulk(self, items: Dict[str, str]) -> bool:
+        """Set several app-wide settings in one round trip. Returns True on success."""
+        if not items:
+            return True
+        keys = list(items.keys())
+        values = [items[k] for k in keys]
+        try:
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                await conn.execute(
+                    """
+                    INSERT INTO app_settings (key, value, updated_at)
+                    SELECT unnest($1::text[]), unnest($2::text[]), NOW()
+                    ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value, updated_at = NOW()
+                    """,
+                    keys,
+                    values,
+                )
+            for key in keys:
+                self._settings_cache.pop(key, None)
+            return True
+        except Exception as e:
+            logger.error("Failed to set %d app settings: %s", len(keys), e)
+            return False
+
     async def get_all_users_for_notifications(self) -> list:
         """Get all users for batch notifications (daily/weekly reports)."""
         try:
-            conn = await self.get_db_connection()
-            
-            users = await conn.fetch("""
-                SELECT id, email, name, preferences 
-                FROM users 
-                WHERE email IS NOT NULL
-                ORDER BY created_at
-            """)
-            
-            await conn.close()
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                # Aggregate server-side: one jsonb value decoded by the pool codec instead of N Records -> dicts
+                users = await conn.fetchval("""
+                    SELECT COALESCE(
+                        jsonb_agg(
+                            jsonb_build_object('id', id, 'email', email, 'name', name, 'preferences', preferences)
+                            ORDER BY created_at
+                        ),
+                        '[]'::jsonb
+                    )
+                    FROM users 
+                    WHERE email IS NOT NULL
+                """)
             
-            return [dict(user) for user in users]
+            return users
             
         except Exception as e:
             logger.error(f"Failed to get users for notifications: {str(e)}")
             return []
 
+    async def iter_users_for_notifications(self, prefetch: int = 1000) -> AsyncIterator[Dict[str, Any]]:
+        """Stream users for batch notifications through a server-side cursor, so large
+        sends never hold the full user list in memory."""
+        try:
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                # Cursors only live inside a transaction
+                async with conn.transaction():
+                    async for user in conn.cursor(
+                        """
+                        SELECT id, email, name, preferences
+                        FROM users
+                        WHERE email IS NOT NULL
+                        ORDER BY created_at
+                        """,
+                        prefetch=prefetch,
+                    ):
+                        yield dict(user)
+        except Exception as e:
+            logger.error(f"Failed to stream users for notifications: {str(e)}")
+
 # Example usage and testing
 async def test_user_service():
     """Test the user service functionality."""
@@ -8,15 +8,45 @@ using state-of-the-art agentic patterns with LangChain and LangGraph.
 """
 
 import asyncio
-import json
+import atexit
+import copy
+import functools
+import hashlib
+import itertools
+import logging
+import logging.handlers
+import operator
 import os
+import queue
+import re
+import secrets
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, Any, List, Optional, TypedDict, Annotated
-import uuid
+from types import MappingProxyType
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple, TypedDict, Annotated
+
+import httpx
+import numpy as np
+import orjson
+
+try:
+    import ahocorasick
+except ImportError:  # Optional: supervisor keyword matching falls back to a per-keyword scan
+    ahocorasick = None
+
+try:
+    import numba
+except ImportError:  # Optional: bulk short-answer grading falls back to plain Python
+    numba = None
 
 # Core imports
 import openai
 from strict_env import get_required  # Enforces strict .env loading on import
+from diagram_utils import make_diagram_data_url
 
 # LangChain imports
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, BaseMessage
@@ -27,25 +57,101 @@ from langchain_anthropic import ChatAnthropic
 
 # LangGraph imports  
 from langgraph.graph import StateGraph, END
+from langgraph.graph.message import add_messages
 from langgraph.checkpoint.memory import MemorySaver
+from langgraph.cache.memory import InMemoryCache
+from langgraph.types import CachePolicy
 from typing_extensions import TypedDict
 
 # Pydantic for structured outputs
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 
 # Data persistence
 import sqlite3
-import json
 
 # Email service
 from email_service import email_service
 
 # strict_env already loaded .env; no further action needed
 
+# Static assessment instructions. Kept free of per-request interpolation so the prompt prefix is
+# byte-identical across calls and hits the provider prompt cache; the concept/subject context goes
+# in the human message and the student profile is baked into PROMPT_VARIANTS below.
+ASSESSMENT_SYSTEM_PROMPT = """You are an expert Assessment Agent creating a meaningful quiz to evaluate student understanding of a concept. The student's difficulty level and learning style are given below; the concept, subject and any previous teaching exchanges are given in the user message.
+
+ASSESSMENT DESIGN GUIDELINES:
+1. Create exactly 3 questions that test comprehension of the concept
+2. Make questions progressively more challenging
+3. Questions should be relevant to what was covered in the teaching session
+4. Adapt question style to the student's learning style
+5. Include a mix of question types (multiple choice, true/false, short answer)
+6. Provide clear, informative feedback for each possible answer
+7. Number question ids q1, q2, q3 and set passing_score to 2
+
+IMPORTANT:
+- For multiple_choice questions, include 3-4 options, with exactly one correct answer
+- For true_false questions, provide options ["True", "False"] and correct_answer should be "True" or "False"
+- For short_answer questions, provide an empty options array [] and correct_answer should be a string with the expected answer
+- Ensure the questions genuinely assess understanding, not just recall
+- Target the questions to the requested difficulty level"""
+
+
+# Shared config for the workflow models: plain data holders, no re-validation on assignment
+_MODEL_CONFIG = ConfigDict(validate_assignment=False, extra="ignore")
+
+
+# Assessment prompt specialized per (difficulty, learning style) tier. The 12 variants are built
+# once at import, so each request picks a fixed string and the full system block stays
+# byte-identical for every request in the same tier (provider prompt cache hits).
+_DIFFICULTY_GUIDANCE = {
+    "beginner": "Test core definitions and simple, concrete examples.",
+    "intermediate": "Test applying the concept and recognising common pitfalls.",
+    "advanced": "Test edge cases, trade-offs and connections to related concepts.",
+}
+_LEARNING_STYLE_GUIDANCE = {
+    "visual": "Favour questions about diagrams, visual patterns and spatial relationships the student can picture.",
+    "hands_on": "Favour scenario questions: what happens when the student does, builds or runs something.",
+    "reading": "Favour definitional questions and reasoning from a short written description.",
+    "mixed": "Mix conceptual and applied questions.",
+}
+
+
+def _compile_prompt(difficulty: str, learning_style: str) -> str:
+    return (
+        f"{ASSESSMENT_SYSTEM_PROMPT}\n\n"
+        f"STUDENT PROFILE:\n"
+        f"- Difficulty Level: {difficulty}\n"
+        f"- Learning Style: {learning_style}\n"
+        f"- {_DIFFICULTY_GUIDANCE[difficulty]}\n"
+        f"- {_LEARNING_STYLE_GUIDANCE[learning_style]}"
+    )
+
+
+PROMPT_VARIANTS = {
+    (d, ls): _compile_prompt(d, ls) for d in _DIFFICULTY_GUIDANCE for ls in _LEARNING_STYLE_GUIDANCE
+}
+
+
+def _difficulty_tier(difficulty: str) -> str:
+    """Map free-form difficulty (e.g. "Intermediate") onto a prompt tier."""
+    value = (difficulty or "").lower()
+    for tier in ("beginner", "advanced", "intermediate"):
+        if tier in value:
+            return tier
+    return "intermediate"
+
+
+def _learning_style_tier(learning_style: str) -> str:
+    """Map free-form learning style (e.g. "Visual + Hands-on") onto a prompt tier."""
+    value = (learning_style or "").lower()
+    matched = [tier for tier, word in (("visual", "visual"), ("hands_on", "hands"), ("reading", "read")) if word in value]
+    return matched[0] if len(matched) == 1 else "mixed"
+
 
 class LearningObjective(BaseModel):
     """Structured learning objective definition."""
+    model_config = _MODEL_CONFIG
     subject: str = Field(..., description="Subject to learn")
     learning_style: str = Field(..., description="Preferred learning style")
     difficulty: str = Field(..., description="Difficulty level")
@@ -55,8 +161,9 @@ class LearningObjective(BaseModel):
 
 class LearningPlan(BaseModel):
     """Generated learning plan structure."""
-    plan_id: str = Field(..., description="Unique plan identifier")
-    user_id: str = Field(..., description="User identifier")
+    model_config = _MODEL_CONFIG
+    plan_id: str = Field(default="", description="Unique plan identifier (assigned by ManagerAgent)")
+    user_id: str = Field(default="", description="User identifier (assigned by ManagerAgent)")
     objectives: LearningObjective
     modules: List[str] = Field(default=[], description="Learning modules")
     estimated_duration: int = Field(..., description="Estimated duration in weeks")
@@ -67,6 +174,7 @@ class LearningPlan(BaseModel):
 
 class KanbanTask(BaseModel):
     """Kanban board task structure."""
+    model_config = _MODEL_CONFIG
     task_id: str = Field(..., description="Unique task identifier")
     title: str = Field(..., description="Task title")
     status: str = Field(default="todo", description="Task status")
@@ -75,19 +183,465 @@ class KanbanTask(BaseModel):
     created_at: datetime = Field(default_factory=datetime.now)
 
 
+class AssessmentQuestion(BaseModel):
+    """Single assessment question as returned by the LLM."""
+    model_config = _MODEL_CONFIG
+    id: str = Field(..., description="Question identifier, e.g. q1")
+    question: str = Field(..., description="Question text")
+    type: str = Field(..., description="multiple_choice, true_false or short_answer")
+    options: List[str] = Field(default=[], description="Answer options; empty for short_answer")
+    correct_answer: str = Field(..., description="Correct option text, True/False, or expected short answer")
+    explanation: str = Field(..., description="Explanation of the correct answer")
+
+
+class Assessment(BaseModel):
+    """Structured assessment output (used with the LLM's structured-output mode)."""
+    model_config = _MODEL_CONFIG
+    questions: List[AssessmentQuestion] = Field(..., description="Assessment questions")
+    passing_score: int = Field(default=2, description="Correct answers required to pass")
+    concept_assessed: str = Field(default="", description="Concept being assessed")
+    difficulty: str = Field(default="", description="Difficulty level")
+
+
+def _merge_tasks(left: Dict[str, Dict[str, Any]], right: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """State reducer: Kanban tasks keyed by slot (the assigned agent), insertion order kept.
+
+    An update is merged into the existing entry for its slot, so a node completes its task by
+    returning {"Planner": {"status": "completed"}}: an O(1) patch that does not echo back
+    (id-bearing, non-cacheable) state.
+    """
+    merged = dict(left)
+    for slot, update in right.items():
+        merged[slot] = {**merged[slot], **update} if slot in merged else update
+    return merged
+
+
+# Cap on messages carried in workflow state (and so in every checkpoint write)
+MAX_WORKFLOW_MESSAGES = 20
+_SUMMARY_LINE_CHARS = 160
+_SUMMARY_MAX_CHARS = 2000
+_SUMMARY_MESSAGE_ID = "workflow-history-summary"
+
+
+def _bounded_add_messages(left: List[BaseMessage], right: List[BaseMessage]) -> List[BaseMessage]:
+    """add_messages, then keep only the newest messages; older ones collapse into one summary message."""
+    merged = add_messages(left, right)
+    if len(merged) <= MAX_WORKFLOW_MESSAGES:
+        return merged
+    keep = MAX_WORKFLOW_MESSAGES - 1
+    dropped, kept = merged[:-keep], merged[-keep:]
+    # Extractive summary (reducers are synchronous, so no LLM call here): first line of each dropped message
+    lines = []
+    for message in dropped:
+        text = message.content if isinstance(message.content, str) else str(message.content)
+        if message.id == _SUMMARY_MESSAGE_ID:
+            # An earlier summary: carry its condensed lines over whole, not just its header
+            lines.extend(text.splitlines()[1:])
+            continue
+        first_line = text.strip().splitlines()[0] if text.strip() else ""
+        lines.append(f"- {message.type}: {first_line[:_SUMMARY_LINE_CHARS]}")
+    header = "Earlier conversation (condensed):\n"
+    # Trim the oldest lines, never the header, so a later summary can tell header from content
+    summary = header + "\n".join(lines)[-(_SUMMARY_MAX_CHARS - len(header)):]
+    return [SystemMessage(content=summary, id=_SUMMARY_MESSAGE_ID)] + kept
+
+
+# Node cache for deterministic agents: same learning objective -> same output
+PLAN_NODE_CACHE_TTL_SECONDS = 86400
+
+
+def _learning_objective_cache_key(state: Dict[str, Any]) -> str:
+    """Cache key for nodes whose output depends only on the learning objective."""
+    objective = state.get("learning_objective") or {}
+    return "|".join(
+        str(objective.get(field, "")) for field in ("subject", "learning_style", "difficulty", "timeline")
+    )
+
+
 class WorkflowState(TypedDict):
-    """LangGraph workflow state definition."""
-    messages: List[BaseMessage]
+    """LangGraph workflow state definition.
+
+    messages, kanban_tasks and completed_agents have reducers: nodes return only their delta
+    (new messages, new/patched tasks, their own agent name) and LangGraph merges it, which also
+    lets parallel branches (content curation and assessment) write them in the same step.
+    messages is capped at MAX_WORKFLOW_MESSAGES so state and checkpoints stay bounded.
+    """
+    messages: Annotated[List[BaseMessage], _bounded_add_messages]
     learning_objective: Optional[Dict[str, Any]]
     learning_plan: Optional[Dict[str, Any]]
-    kanban_tasks: List[Dict[str, Any]]
+    kanban_tasks: Annotated[Dict[str, Dict[str, Any]], _merge_tasks]
     current_agent: str
     workflow_stage: str
     thread_id: str
-    completed_agents: List[str]
+    completed_agents: Annotated[List[str], operator.add]
     next_action: str
 
 
+# Display ids for Kanban/notification tasks: only need to be unique within this process's
+# workflows, so a counter with a random per-process prefix is enough (no uuid4 per task).
+_TASK_SEQ = itertools.count()
+_PROC_PREFIX = secrets.token_hex(2)
+
+
+def _task_id(prefix: str = "task") -> str:
+    return f"{prefix}_{_PROC_PREFIX}{next(_TASK_SEQ):06x}"
+
+
+# Assessment cache: exact match on normalized (concept, subject, difficulty tier, learning-style tier),
+# the same tiers that pick the generation prompt, so a hit is what that prompt would have produced
+ASSESSMENT_MEMO_MAX_ENTRIES = 2048
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+SHORT_ANSWER_SIMILARITY_THRESHOLD = float(os.getenv("SHORT_ANSWER_SIMILARITY_THRESHOLD", "0.85"))
+ASSESSMENT_CACHE_DB = os.getenv("ASSESSMENT_CACHE_DB", "assessments.db")
+ASSESSMENT_CACHE_TTL_SECONDS = int(os.getenv("ASSESSMENT_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+
+# Below this many pairs the JIT dispatch/packing overhead outweighs the pure-Python check
+NUMBA_BATCH_MIN_PAIRS = 256
+_prange = numba.prange if numba is not None else range
+
+
+def _bytes_contains(hay, h0, h1, needle, n0, n1):
+    """True if needle[n0:n1] occurs in hay[h0:h1] (byte arrays; empty needle always matches)."""
+    n = n1 - n0
+    for start in range(h0, h1 - n + 1):
+        j = 0
+        while j < n and hay[start + j] == needle[n0 + j]:
+            j += 1
+        if j == n:
+            return True
+    return False
+
+
+def _short_match_kernel(user_buf, user_off, correct_buf, correct_off, out):
+    for i in _prange(out.shape[0]):
+        u0, u1 = user_off[i], user_off[i + 1]
+        c0, c1 = correct_off[i], correct_off[i + 1]
+        out[i] = (_bytes_contains(correct_buf, c0, c1, user_buf, u0, u1)
+                  or _bytes_contains(user_buf, u0, u1, correct_buf, c0, c1))
+
+
+if numba is not None:
+    _bytes_contains = numba.njit(cache=True)(_bytes_contains)
+    _short_match_kernel = numba.njit(parallel=True, cache=True)(_short_match_kernel)
+
+
+def _pack_strings(strings: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Concatenate UTF-8 encodings into one uint8 buffer plus an offsets array."""
+    encoded = [text.encode() for text in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _short_answer_string_matches(pairs: List[Tuple[Any, Any]]) -> List[bool]:
+    """Case-insensitive equality/containment check for (user_answer, correct_answer) pairs."""
+    normalized = [(str(u).lower().strip(), str(c).lower().strip()) for u, c in pairs]
+    if numba is None or len(normalized) < NUMBA_BATCH_MIN_PAIRS:
+        return [u == c or u in c or c in u for u, c in normalized]
+    user_buf, user_off = _pack_strings([u for u, _ in normalized])
+    correct_buf, correct_off = _pack_strings([c for _, c in normalized])
+    out = np.zeros(len(normalized), dtype=np.bool_)
+    _short_match_kernel(user_buf, user_off, correct_buf, correct_off, out)
+    return out.tolist()
+
+
+@functools.lru_cache(maxsize=8)
+def _openai_async_client_for(http_client: Optional[httpx.AsyncClient], api_key: str) -> openai.AsyncOpenAI:
+    return openai.AsyncOpenAI(api_key=api_key, http_client=http_client)
+
+
+def _get_openai_async_client() -> Optional[openai.AsyncOpenAI]:
+    """OpenAI SDK client (embeddings, DALL·E) on the running loop's pooled HTTP/2 transport, or None
+    when OPENAI_API_KEY is not set."""
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        return None
+    return _openai_async_client_for(_get_http_client(), api_key)
+
+
+async def _embed_texts(texts: List[str]) -> Optional[np.ndarray]:
+    """Embed texts in one API call; returns an (N, d) float32 matrix of unit rows, or None if unavailable."""
+    client = _get_openai_async_client()
+    if client is None or not texts:
+        return None
+    try:
+        resp = await client.embeddings.create(model=EMBEDDING_MODEL, input=texts)
+    except Exception as e:
+        print(f"⚠️ Embedding request failed: {e}")
+        return None
+    vectors = np.asarray([item.embedding for item in resp.data], dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class AssessmentCache:
+    """SQLite-backed assessment store shared by every AssessmentAgent in the process.
+
+    WAL lets several worker processes read while one writes; rows older than the TTL are ignored
+    and pruned on write. Calls are blocking, so async callers go through asyncio.to_thread.
+    """
+
+    def __init__(self, path: str = ASSESSMENT_CACHE_DB, ttl_seconds: int = ASSESSMENT_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA mmap_size=268435456")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS assessments (key TEXT PRIMARY KEY, json BLOB, created REAL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT json FROM assessments WHERE key = ? AND created > ?",
+                (key, time.time() - self.ttl_seconds),
+            ).fetchone()
+        return orjson.loads(row[0]) if row else None
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO assessments (key, json, created) VALUES (?, ?, ?)",
+                (key, orjson.dumps(value), now),
+            )
+            self._conn.execute("DELETE FROM assessments WHERE created <= ?", (now - self.ttl_seconds,))
+            self._conn.commit()
+
+
+# Supervisor keyword classification. With pyahocorasick installed, all keywords for all axes live in
+# one Aho-Corasick automaton built at import, so classifying a message is a single pass over it;
+# without it each keyword is searched for in turn. Each keyword maps to (axis, group, whole_word);
+# whole_word keywords must also end at a word boundary.
+_SUPERVISOR_KEYWORDS = {
+    "web dev": ("subject", "web", False),
+    "programming": ("subject", "programming", False),
+    "coding": ("subject", "programming", False),
+    "python": ("subject", "python", False),
+    "javascript": ("subject", "javascript", False),
+    "js": ("subject", "javascript", True),
+    "ai": ("subject", "ai", True),
+    "artificial intelligence": ("subject", "ai", False),
+    "machine learning": ("subject", "ai", False),
+    "data science": ("subject", "data_science", False),
+    "math": ("subject", "math", False),
+    "science": ("subject", "science", False),
+    "visual": ("learning_style", "visual", False),
+    "watch": ("learning_style", "visual", False),
+    "video": ("learning_style", "visual", False),
+    "hands-on": ("learning_style", "hands_on", False),
+    "practice": ("learning_style", "hands_on", False),
+    "build": ("learning_style", "hands_on", False),
+    "reading": ("learning_style", "reading", False),
+    "text": ("learning_style", "reading", False),
+    "book": ("learning_style", "reading", False),
+    "advanced": ("difficulty", "advanced", False),
+    "expert": ("difficulty", "advanced", False),
+    "intermediate": ("difficulty", "intermediate", False),
+    "beginner": ("difficulty", "beginner", False),
+    "basic": ("difficulty", "beginner", False),
+    "start": ("difficulty", "beginner", False),
+}
+if ahocorasick is not None:
+    KEYWORD_AUTOMATON = ahocorasick.Automaton()
+    for _keyword, (_axis, _group, _whole_word) in _SUPERVISOR_KEYWORDS.items():
+        KEYWORD_AUTOMATON.add_word(_keyword, (len(_keyword), _axis, _group, _whole_word))
+    KEYWORD_AUTOMATON.make_automaton()
+else:
+    KEYWORD_AUTOMATON = None
+
+# Group names in priority order per axis (first one present in the message wins), mirroring the old if/elif chain
+SUBJECT_PRIORITY = (
+    ("web", "Web Development"),
+    ("programming", "Programming"),
+    ("python", "Python Programming"),
+    ("javascript", "JavaScript"),
+    ("ai", "Artificial Intelligence"),
+    ("data_science", "Data Science"),
+    ("math", "Mathematics"),
+    ("science", "Science"),
+)
+LEARNING_STYLE_PRIORITY = (("visual", "visual"), ("hands_on", "hands_on"), ("reading", "reading"))
+DIFFICULTY_PRIORITY = (("advanced", "advanced"), ("intermediate", "intermediate"), ("beginner", "beginner"))
+LEARN_VERB_RE = re.compile(r"(?<!\S)(?:learn|study|teach)\s+(\S+(?:\s+\S+)?)", re.IGNORECASE)
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _keyword_matches(text: str):
+    """Yield (end_index, (length, axis, group, whole_word)) for every keyword occurrence in text."""
+    if KEYWORD_AUTOMATON is not None:
+        yield from KEYWORD_AUTOMATON.iter(text)
+        return
+    for keyword, (axis, group, whole_word) in _SUPERVISOR_KEYWORDS.items():
+        start = text.find(keyword)
+        while start != -1:
+            yield start + len(keyword) - 1, (len(keyword), axis, group, whole_word)
+            start = text.find(keyword, start + 1)
+
+
+def _keyword_hits(text: str) -> Dict[str, set]:
+    """Groups matched per axis; keywords must start at a word boundary."""
+    text = text.lower()
+    hits: Dict[str, set] = {"subject": set(), "learning_style": set(), "difficulty": set()}
+    for end, (length, axis, group, whole_word) in _keyword_matches(text):
+        start = end - length + 1
+        if start > 0 and _is_word_char(text[start - 1]):
+            continue
+        if whole_word and end + 1 < len(text) and _is_word_char(text[end + 1]):
+            continue
+        hits[axis].add(group)
+    return hits
+
+
+def _classify(priority: Tuple[Tuple[str, str], ...], hits: set, default: Optional[str]) -> Optional[str]:
+    """Return the label of the highest-priority matched group, else default."""
+    for group, label in priority:
+        if group in hits:
+            return label
+    return default
+
+
+class AssessmentMemo:
+    """In-memory exact-match front for the SQLite AssessmentCache (memory-only without a store)."""
+
+    def __init__(self, store: Optional[AssessmentCache] = None, max_entries: int = ASSESSMENT_MEMO_MAX_ENTRIES):
+        self.store = store
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+
+    @staticmethod
+    def make_key(concept: str, subject: str, difficulty: str, learning_style: str) -> str:
+        """Case- and whitespace-insensitive key; difficulty and style collapse to their prompt tiers."""
+        parts = (concept, subject, _difficulty_tier(difficulty), _learning_style_tier(learning_style))
+        return "|".join(" ".join(str(p).lower().split()) for p in parts)
+
+    async def get(self, key: str) -> Optional[Any]:
+        hit = self._entries.get(key)
+        if hit is not None:
+            self._entries.move_to_end(key)
+            return hit
+        if self.store is not None:
+            hit = await asyncio.to_thread(self.store.get, key)
+            if hit is not None:
+                self._add(key, hit)
+        return hit
+
+    async def put(self, key: str, value: Any) -> None:
+        self._add(key, value)
+        if self.store is not None:
+            try:
+                await asyncio.to_thread(self.store.put, key, value)
+            except Exception as e:
+                print(f"⚠️ Failed to persist assessment cache entry: {e}")
+
+    def _add(self, key: str, value: Any) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_assessment_cache() -> AssessmentMemo:
+    """Process-wide assessment cache; falls back to memory-only if the SQLite file can't be opened."""
+    try:
+        store = AssessmentCache()
+    except Exception as e:
+        print(f"⚠️ Assessment cache DB unavailable, using in-memory cache only: {e}")
+        store = None
+    return AssessmentMemo(store=store)
+
+
+# One pooled HTTP/2 client per event loop for all OpenAI traffic (chat + embeddings): concurrent
+# agent calls multiplex over a few kept-alive connections instead of queueing on per-client pools.
+# Connections belong to the loop that opened them, so each loop (a later asyncio.run(), a test)
+# gets its own client. The read timeout matches the OpenAI SDK default so long generations finish.
+LLM_HTTP_TIMEOUT_SECONDS = float(os.getenv("LLM_HTTP_TIMEOUT_SECONDS", "600"))
+_HTTP_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def _get_http_client() -> Optional[httpx.AsyncClient]:
+    """Shared HTTP client for the running event loop; None outside a loop (the SDK then uses its own)."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+    client = _HTTP_CLIENTS.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(LLM_HTTP_TIMEOUT_SECONDS, connect=5.0),
+            limits=httpx.Limits(max_connections=1000, max_keepalive_connections=200),
+        )
+        _HTTP_CLIENTS[loop] = client
+    return client
+
+
+async def close_http_client() -> None:
+    """Close the running loop's shared HTTP client (call on application shutdown) and drop the
+    chat/SDK clients built on it."""
+    client = _HTTP_CLIENTS.pop(asyncio.get_running_loop(), None)
+    _get_llm.cache_clear()
+    _openai_async_client_for.cache_clear()
+    if client is not None:
+        await client.aclose()
+
+
+@functools.lru_cache(maxsize=32)
+def _get_llm(model: str, temperature: float, max_tokens: int, http_client: Optional[httpx.AsyncClient] = None):
+    """Build the chat model for (model, temperature, max_tokens) on the given HTTP client.
+
+    Memoized so agents that share settings also share one client and its HTTP connection pool
+    instead of each opening their own.
+    """
+    openai_key = os.getenv("OPENAI_API_KEY")
+    anthropic_key = os.getenv("ANTHROPIC_API_KEY")
+    
+    # Set default temperature for models that don't support custom temperatures
+    # o4-mini only supports temperature=1.0
+    temp_to_use = 1.0 if model == "o4-mini" else temperature
+
+    if "gpt" in model or model.startswith("o4"):
+        if not openai_key:
+            raise RuntimeError("OPENAI_API_KEY is not set. Please add it to .env and restart the server.")
+        return ChatOpenAI(
+            model=model,
+            temperature=temp_to_use,
+            api_key=openai_key,
+            max_tokens=max_tokens,
+            http_async_client=http_client
+        )
+    elif "claude" in model:
+        if not anthropic_key:
+            raise RuntimeError("ANTHROPIC_API_KEY is not set. Please add it to .env and restart the server.")
+        return ChatAnthropic(
+            model=model,
+            temperature=temperature,
+            api_key=anthropic_key,
+            max_tokens=max_tokens
+        )
+    else:
+        # Fallback to OpenAI default model
+        if not openai_key:
+            raise RuntimeError("OPENAI_API_KEY is not set. Please add it to .env and restart the server.")
+        # Use default temperature 1.0 for o4-mini
+        return ChatOpenAI(
+            model="o4-mini",
+            temperature=1.0,
+            api_key=openai_key,
+            max_tokens=max_tokens,
+            http_async_client=http_client
+        )
+
+
 class VEDYAAgent:
     """Base class for VEDYA agents."""
     
@@ -100,47 +654,31 @@ class VEDYAAgent:
             self.max_tokens = int(os.getenv("OPENAI_MAX_TOKENS", 4000))
         except Exception:
             self.max_tokens = 4000
-        self.llm = self._create_llm()
+        self._create_llm()  # Fail fast on a missing API key
+
+    @property
+    def llm(self):
+        """Chat model bound to the running event loop's shared HTTP client."""
+        return self._create_llm()
 
     def _create_llm(self):
-        """Create appropriate LLM based on configuration."""
-        openai_key = os.getenv("OPENAI_API_KEY")
-        anthropic_key = os.getenv("ANTHROPIC_API_KEY")
-        
-        # Set default temperature for models that don't support custom temperatures
-        # o4-mini only supports temperature=1.0
-        temp_to_use = 1.0 if self.model == "o4-mini" else self.temperature
-
-        if "gpt" in self.model or self.model.startswith("o4"):
-            if not openai_key:
-                raise RuntimeError("OPENAI_API_KEY is not set. Please add it to .env and restart the server.")
-            return ChatOpenAI(
-                model=self.model,
-                temperature=temp_to_use,
-                api_key=openai_key,
-                max_tokens=self.max_tokens
-            )
-        elif "claude" in self.model:
-            if not anthropic_key:
-                raise RuntimeError("ANTHROPIC_API_KEY is not set. Please add it to .env and restart the server.")
-            return ChatAnthropic(
-                model=self.model,
-                temperature=self.temperature,
-                api_key=anthropic_key,
-                max_tokens=self.max_tokens
-            )
-        else:
-            # Fallback to OpenAI default model
-            if not openai_key:
-                raise RuntimeError("OPENAI_API_KEY is not set. Please add it to .env and restart the server.")
-            # Use default temperature 1.0 for o4-mini
-            return ChatOpenAI(
-                model="o4-mini",
-                temperature=1.0,
-                api_key=openai_key,
-                max_tokens=self.max_tokens
-            )
+        """Create appropriate LLM based on configuration (shared across agents with the same settings)."""
+        # o4-mini ignores custom temperatures; normalize so all o4-mini agents hit the same cache entry
+        temperature = 1.0 if self.model == "o4-mini" else self.temperature
+        return _get_llm(self.model, temperature, self.max_tokens, _get_http_client())
     
+    def _cached_system_message(self, text: str) -> SystemMessage:
+        """Wrap a static system prompt so the provider can reuse its prompt cache across calls.
+
+        OpenAI caches identical prompt prefixes automatically; Anthropic needs an explicit
+        cache_control breakpoint on the block.
+        """
+        if isinstance(self.llm, ChatAnthropic):
+            return SystemMessage(content=[
+                {"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}
+            ])
+        return SystemMessage(content=text)
+
     async def execute(self, state: WorkflowState) -> Dict[str, Any]:
         """Execute agent logic (to be implemented by subclasses)."""
         raise NotImplementedError("Subclasses must implement execute method")
@@ -162,52 +700,19 @@ class SupervisorAgent(VEDYAAgent):
         if not learning_objective and messages:
             last_message = messages[-1]
             if isinstance(last_message, HumanMessage):
-                user_input = last_message.content.lower()
+                user_input = last_message.content
                 
-                # Extract subject from user input
-                subject = "General Learning"
-                if "web development" in user_input or "web dev" in user_input:
-                    subject = "Web Development"
-                elif "programming" in user_input or "coding" in user_input:
-                    subject = "Programming"
-                elif "python" in user_input:
-                    subject = "Python Programming"
-                elif "javascript" in user_input or "js" in user_input:
-                    subject = "JavaScript"
-                elif "ai" in user_input or "artificial intelligence" in user_input or "machine learning" in user_input:
-                    subject = "Artificial Intelligence"
-                elif "data science" in user_input:
-                    subject = "Data Science"
-                elif "math" in user_input or "mathematics" in user_input:
-                    subject = "Mathematics"
-                elif "science" in user_input:
-                    subject = "Science"
-                else:
+                # Extract subject from user input (one automaton pass; highest-priority hit per axis wins)
+                hits = _keyword_hits(user_input)
+                subject = _classify(SUBJECT_PRIORITY, hits["subject"], None)
+                if subject is None:
                     # Try to extract the main topic from the message
-                    words = user_input.split()
-                    for i, word in enumerate(words):
-                        if word in ["learn", "study", "teach"] and i + 1 < len(words):
-                            potential_subject = " ".join(words[i+1:i+3])
-                            subject = potential_subject.title()
-                            break
+                    learn_match = LEARN_VERB_RE.search(user_input)
+                    subject = learn_match.group(1).title() if learn_match else "General Learning"
                 
-                # Determine learning style from input
-                learning_style = "mixed"
-                if "visual" in user_input or "watch" in user_input or "video" in user_input:
-                    learning_style = "visual"
-                elif "hands-on" in user_input or "practice" in user_input or "build" in user_input:
-                    learning_style = "hands_on"
-                elif "reading" in user_input or "text" in user_input or "book" in user_input:
-                    learning_style = "reading"
-                
-                # Determine difficulty level
-                difficulty = "beginner"
-                if "advanced" in user_input or "expert" in user_input:
-                    difficulty = "advanced"
-                elif "intermediate" in user_input:
-                    difficulty = "intermediate"
-                elif "beginner" in user_input or "basic" in user_input or "start" in user_input:
-                    difficulty = "beginner"
+                # Determine learning style and difficulty from input
+                learning_style = _classify(LEARNING_STYLE_PRIORITY, hits["learning_style"], "mixed")
+                difficulty = _classify(DIFFICULTY_PRIORITY, hits["difficulty"], "beginner")
                 
                 learning_objective = {
                     "subject": subject,
@@ -218,22 +723,22 @@ class SupervisorAgent(VEDYAAgent):
                 }
         
         # Create initial Kanban tasks
-        tasks = [
-            {
-                "task_id": f"task_{uuid.uuid4().hex[:8]}",
+        tasks = {
+            "Planner": {
+                "task_id": _task_id("task"),
                 "title": "Create Learning Plan",
                 "status": "in_progress",
                 "assigned_agent": "Planner",
                 "priority": "high"
             },
-            {
-                "task_id": f"task_{uuid.uuid4().hex[:8]}",
+            "ContentCurator": {
+                "task_id": _task_id("task"),
                 "title": "Curate Content",
                 "status": "todo",
                 "assigned_agent": "ContentCurator",
                 "priority": "high"
             }
-        ]
+        }
         
         return {
             "learning_objective": learning_objective,
@@ -255,10 +760,9 @@ class PlannerAgent(VEDYAAgent):
         """Create structured learning plan."""
         learning_objective = state.get("learning_objective", {})
         
-        # Create learning plan
+        # Create learning plan. Output must stay a pure function of the objective (the node is
+        # cached), so plan_id/user_id are assigned later by ManagerAgent.
         plan = LearningPlan(
-            plan_id=f"plan_user_{uuid.uuid4().hex[:6]}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-            user_id=f"user_{uuid.uuid4().hex[:8]}",
             objectives=LearningObjective(**learning_objective),
             modules=["Introduction", "Core Concepts", "Advanced Topics"],
             estimated_duration=max(8, learning_objective.get("timeline", 12) - 2),
@@ -266,20 +770,14 @@ class PlannerAgent(VEDYAAgent):
             learning_path=f"{learning_objective.get('learning_style', 'mixed').title()} Learning Path"
         )
         
-        # Update Kanban
-        updated_tasks = []
-        for task in state.get("kanban_tasks", []):
-            if task["assigned_agent"] == "Planner":
-                task["status"] = "completed"
-            updated_tasks.append(task)
-        
         return {
-            "learning_plan": plan.model_dump(),
-            "kanban_tasks": updated_tasks,
-            "current_agent": "ContentCurator",
+            # Call the compiled serializer directly (skips model_dump's per-call argument handling)
+            "learning_plan": plan.__pydantic_serializer__.to_python(plan),
+            "kanban_tasks": {"Planner": {"status": "completed"}},
+            "current_agent": "ContentCurator+AssessmentAgent",
             "workflow_stage": "content_curation",
-            "next_action": "curate_content",
-            "completed_agents": state.get("completed_agents", []) + ["Planner"]
+            "next_action": "curate_content_and_assess",
+            "completed_agents": ["Planner"]
         }
 
 
@@ -318,25 +816,64 @@ class ContentCuratorAgent(VEDYAAgent):
                 "Academic Articles"
             ]
         
-        # Update learning plan with curated content
+        # Update learning plan with curated content (copy: the assessment branch reads the same state)
         if learning_plan:
-            learning_plan["content_items"] = curated_content
-        
-        # Update Kanban
-        updated_tasks = []
-        for task in state.get("kanban_tasks", []):
-            if task["assigned_agent"] == "ContentCurator":
-                task["status"] = "completed"
-            updated_tasks.append(task)
+            learning_plan = {**learning_plan, "content_items": curated_content}
         
+        # Runs in parallel with AssessmentAgent: only return keys this branch owns or that have reducers
         return {
             "learning_plan": learning_plan,
-            "kanban_tasks": updated_tasks,
-            "current_agent": "AssessmentAgent",
-            "workflow_stage": "assessment_creation",
-            "next_action": "create_assessment",
-            "completed_agents": state.get("completed_agents", []) + ["ContentCurator"]
+            "kanban_tasks": {"ContentCurator": {"status": "completed"}},
+            "completed_agents": ["ContentCurator"]
+        }
+
+
+# Fallback assessment pre-serialized once; per request only the placeholders are substituted
+_FALLBACK_ASSESSMENT_TEMPLATE = orjson.dumps({
+    "questions": [
+        {
+            "id": "q1",
+            "question": "Which of the following best describes __CONCEPT__?",
+            "type": "multiple_choice",
+            "options": [
+                "A key concept in __SUBJECT__",
+                "An unrelated topic to __SUBJECT__",
+                "A historical figure in __SUBJECT__",
+                "A tool used only in advanced __SUBJECT__"
+            ],
+            "correct_answer": "A key concept in __SUBJECT__",
+            "explanation": "__CONCEPT__ is indeed a fundamental concept in __SUBJECT__."
+        },
+        {
+            "id": "q2",
+            "question": "True or False: __CONCEPT__ is important for understanding __SUBJECT__.",
+            "type": "true_false",
+            "options": ["True", "False"],
+            "correct_answer": "True",
+            "explanation": "__CONCEPT__ is a crucial component for understanding __SUBJECT__."
         }
+    ],
+    "passing_score": 1,
+    "concept_assessed": "__CONCEPT__",
+    "difficulty": "__DIFFICULTY__",
+    "created_at": "__CREATED_AT__"
+})
+
+
+def _json_fragment(value: str) -> bytes:
+    """value JSON-escaped, without the surrounding quotes, for splicing into a JSON string."""
+    return orjson.dumps(value)[1:-1]
+
+
+def _fallback_assessment_bytes(concept: str, subject: str, difficulty: str) -> bytes:
+    """Serialized fallback assessment for the given concept/subject/difficulty."""
+    return (
+        _FALLBACK_ASSESSMENT_TEMPLATE
+        .replace(b"__CONCEPT__", _json_fragment(concept))
+        .replace(b"__SUBJECT__", _json_fragment(subject))
+        .replace(b"__DIFFICULTY__", _json_fragment(difficulty))
+        .replace(b"__CREATED_AT__", datetime.now().isoformat().encode())
+    )
 
 
 class AssessmentAgent(VEDYAAgent):
@@ -345,228 +882,227 @@ class AssessmentAgent(VEDYAAgent):
     def __init__(self):
         model = os.getenv("ASSESSMENT_AGENT_MODEL", "o4-mini")
         super().__init__("AssessmentAgent", model, 0.2)
-        self.assessment_cache = {}  # In-memory cache for assessments; would be DB in production
+        self.assessment_cache = _get_assessment_cache()  # Shared, SQLite-backed
+        self._structured: Tuple[Any, Any] = (None, None)  # (llm, llm.with_structured_output(Assessment))
+    
+    @property
+    def structured_llm(self):
+        """Function-calling / tool-use output: always parseable, no regex or JSON repair on our side."""
+        llm = self.llm
+        if self._structured[0] is not llm:
+            self._structured = (llm, llm.with_structured_output(Assessment))
+        return self._structured[1]
     
     async def execute(self, state: WorkflowState) -> Dict[str, Any]:
         """Create assessments and quizzes."""
-        learning_plan = state.get("learning_plan", {})
-        
         # Add assessment task to Kanban
         new_task = {
-            "task_id": f"task_{uuid.uuid4().hex[:8]}",
+            "task_id": _task_id("task"),
             "title": "Create Assessment Quiz",
             "status": "completed",
             "assigned_agent": "AssessmentAgent",
             "priority": "medium"
         }
         
-        updated_tasks = state.get("kanban_tasks", []) + [new_task]
-        
+        # Runs in parallel with ContentCurator: only return keys that have reducers
         return {
-            "learning_plan": learning_plan,
-            "kanban_tasks": updated_tasks,
-            "current_agent": "ManagerAgent",
-            "workflow_stage": "coordination",
-            "next_action": "coordinate",
-            "completed_agents": state.get("completed_agents", []) + ["AssessmentAgent"]
+            "kanban_tasks": {"AssessmentAgent": new_task},
+            "completed_agents": ["AssessmentAgent"]
         }
     
-    async def create_assessment_for_concept(self, concept: str, subject: str, difficulty: str, 
-                                       learning_style: str, previous_responses: List[str] = None) -> Dict[str, Any]:
-        """Create an assessment quiz for a specific concept."""
-        
-        # Check cache first
-        cache_key = f"{concept}_{subject}_{difficulty}"
-        if cache_key in self.assessment_cache:
-            return {
-                "success": True,
-                "assessment": self.assessment_cache[cache_key],
-                "from_cache": True
-            }
-        
-        # Build assessment prompt
+    def _assessment_messages(self, concept: str, subject: str, difficulty: str,
+                             learning_style: str, previous_responses: Optional[List[str]]) -> List[BaseMessage]:
+        """Build assessment prompt: static system block first (cacheable), request-specific context last."""
         previous_context = ""
         if previous_responses and len(previous_responses) > 0:
             previous_context = "Previous teaching exchanges:\n\n" + "\n".join([
                 f"- {resp[:100]}..." for resp in previous_responses[:3]
             ])
 
-        system_prompt = f"""You are an expert Assessment Agent creating a meaningful quiz to evaluate student understanding of {concept} in {subject}.
-
-CONTEXT:
-- Student's Learning Style: {learning_style}
-- Difficulty Level: {difficulty}
-- Concept Being Assessed: {concept}
-{previous_context}
+        request_prompt = f"Create an assessment for {concept} in {subject}.\n{previous_context}"
 
-ASSESSMENT DESIGN GUIDELINES:
-1. Create exactly 3 questions that test comprehension of {concept}
-2. Make questions progressively more challenging
-3. Questions should be relevant to what was covered in the teaching session
-4. Adapt question style to {learning_style} learners
-5. Include a mix of question types (multiple choice, true/false, short answer)
-6. Provide clear, informative feedback for each possible answer
-
-OUTPUT FORMAT:
-Return a valid JSON object with this exact structure:
-{{
-  "questions": [
-    {{
-      "id": "q1",
-      "question": "Question text here",
-      "type": "multiple_choice|true_false|short_answer",
-      "options": ["Option A", "Option B", "Option C", "Option D"], 
-      "correct_answer": "Correct option here or index",
-      "explanation": "Explanation of the correct answer"
-    }},
-    ...
-  ],
-  "passing_score": 2,
-  "concept_assessed": "{concept}",
-  "difficulty": "{difficulty}"
-}}
+        system_prompt = PROMPT_VARIANTS[(_difficulty_tier(difficulty), _learning_style_tier(learning_style))]
+        return [
+            self._cached_system_message(system_prompt),
+            HumanMessage(content=request_prompt)
+        ]
 
-IMPORTANT:
-- For multiple_choice questions, include 3-4 options, with exactly one correct answer
-- For true_false questions, provide options ["True", "False"] and correct_answer should be "True" or "False"
-- For short_answer questions, provide an empty options array [] and correct_answer should be a string with the expected answer
-- Ensure the questions genuinely assess understanding, not just recall
-- Target the questions to {difficulty} level"""
+    @staticmethod
+    def _finalize_assessment(assessment: Dict[str, Any], concept: str, subject: str,
+                             difficulty: str, learning_style: str) -> Dict[str, Any]:
+        """Add assessment metadata."""
+        assessment["concept"] = concept
+        assessment["concept_assessed"] = concept
+        assessment["subject"] = subject
+        assessment["difficulty"] = difficulty
+        assessment["learning_style"] = learning_style
+        assessment["created_at"] = datetime.now().isoformat()
+        return assessment
 
+    async def create_assessment_for_concept(self, concept: str, subject: str, difficulty: str, 
+                                       learning_style: str, previous_responses: List[str] = None) -> Dict[str, Any]:
+        """Create an assessment quiz for a specific concept."""
+        
+        # Check cache first (exact match on concept, subject and prompt tiers)
+        cache_key = AssessmentMemo.make_key(concept, subject, difficulty, learning_style)
+        cached = await self.assessment_cache.get(cache_key)
+        if cached is not None:
+            return {
+                "success": True,
+                "assessment": cached,
+                "from_cache": True
+            }
+        
         try:
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=f"Create an assessment for {concept} in {subject} at {difficulty} level")
-            ]
-            
-            response = await self.llm.ainvoke(messages)
-            
-            # Extract JSON from response
-            response_text = response.content
+            messages = self._assessment_messages(concept, subject, difficulty, learning_style, previous_responses)
+            result = await self.structured_llm.ainvoke(messages)
+            assessment = self._finalize_assessment(result.__pydantic_serializer__.to_python(result), concept, subject, difficulty, learning_style)
             
-            # Try to find JSON in the response
-            import re
-            import json
+            # Cache the assessment
+            await self.assessment_cache.put(cache_key, assessment)
             
-            json_match = re.search(r'```json\s*([\s\S]*?)\s*```', response_text)
-            if json_match:
-                json_str = json_match.group(1)
-            else:
-                # Try to find JSON without code blocks
-                json_match = re.search(r'({[\s\S]*})', response_text)
-                if json_match:
-                    json_str = json_match.group(1)
-                else:
-                    json_str = response_text
-            
-            try:
-                assessment = json.loads(json_str)
-                
-                # Ensure assessment has the correct structure
-                if not isinstance(assessment, dict) or "questions" not in assessment:
-                    raise ValueError("Invalid assessment structure")
-                
-                # Add assessment metadata
-                assessment["concept"] = concept
-                assessment["subject"] = subject
-                assessment["difficulty"] = difficulty
-                assessment["learning_style"] = learning_style
-                assessment["created_at"] = datetime.now().isoformat()
-                
-                # Cache the assessment
-                self.assessment_cache[cache_key] = assessment
-                
-                return {
-                    "success": True,
-                    "assessment": assessment
-                }
-                
-            except json.JSONDecodeError:
-                print(f"Error parsing assessment JSON: {json_str}")
-                # Fallback to basic assessment
-                fallback = self._create_fallback_assessment(concept, subject, difficulty)
-                self.assessment_cache[cache_key] = fallback
-                return {
-                    "success": False,
-                    "error": "Failed to parse assessment JSON",
-                    "assessment": fallback
-                }
+            return {
+                "success": True,
+                "assessment": assessment
+            }
                 
         except Exception as e:
             print(f"Error creating assessment: {e}")
+            # Not cached: a transient LLM/parse failure must not be served to later requests
             fallback = self._create_fallback_assessment(concept, subject, difficulty)
-            self.assessment_cache[cache_key] = fallback
             return {
                 "success": False,
                 "error": str(e),
                 "assessment": fallback
             }
     
+    async def stream_assessment_for_concept(self, concept: str, subject: str, difficulty: str,
+                                            learning_style: str, previous_responses: List[str] = None):
+        """Stream an assessment: yield each question as soon as it is complete, then the full assessment.
+
+        Yields {"type": "question", "question": {...}} events followed by one
+        {"type": "assessment", ...} event shaped like create_assessment_for_concept's result.
+        """
+        cache_key = AssessmentMemo.make_key(concept, subject, difficulty, learning_style)
+        cached = await self.assessment_cache.get(cache_key)
+        if cached is not None:
+            for question in cached.get("questions", []):
+                yield {"type": "question", "question": question}
+            yield {"type": "assessment", "success": True, "assessment": cached, "from_cache": True}
+            return
+        
+        emitted = 0
+        latest = None
+        try:
+            messages = self._assessment_messages(concept, subject, difficulty, learning_style, previous_responses)
+            # Partial objects grow as tokens arrive; a question is final once the next one has started
+            async for partial in self.structured_llm.astream(messages):
+                latest = partial
+                questions = partial.questions
+                while emitted < len(questions) - 1:
+                    yield {"type": "question", "question": questions[emitted].model_dump()}
+                    emitted += 1
+            if latest is None:
+                raise ValueError("Empty assessment stream")
+            assessment = self._finalize_assessment(latest.__pydantic_serializer__.to_python(latest), concept, subject, difficulty, learning_style)
+            for question in assessment["questions"][emitted:]:
+                yield {"type": "question", "question": question}
+            await self.assessment_cache.put(cache_key, assessment)
+            yield {"type": "assessment", "success": True, "assessment": assessment}
+        
+        except Exception as e:
+            print(f"Error streaming assessment: {e}")
+            fallback = self._create_fallback_assessment(concept, subject, difficulty)
+            if emitted == 0:
+                for question in fallback["questions"]:
+                    yield {"type": "question", "question": question}
+            yield {"type": "assessment", "success": False, "error": str(e), "assessment": fallback}
+    
     def _create_fallback_assessment(self, concept: str, subject: str, difficulty: str) -> Dict[str, Any]:
         """Create a basic fallback assessment when the main generation fails."""
-        return {
-            "questions": [
-                {
-                    "id": "q1",
-                    "question": f"Which of the following best describes {concept}?",
-                    "type": "multiple_choice",
-                    "options": [
-                        f"A key concept in {subject}",
-                        f"An unrelated topic to {subject}",
-                        f"A historical figure in {subject}",
-                        f"A tool used only in advanced {subject}"
-                    ],
-                    "correct_answer": "A key concept in {subject}",
-                    "explanation": f"{concept} is indeed a fundamental concept in {subject}."
-                },
-                {
-                    "id": "q2",
-                    "question": f"True or False: {concept} is important for understanding {subject}.",
-                    "type": "true_false",
-                    "options": ["True", "False"],
-                    "correct_answer": "True",
-                    "explanation": f"{concept} is a crucial component for understanding {subject}."
-                }
-            ],
-            "passing_score": 1,
-            "concept_assessed": concept,
-            "difficulty": difficulty,
-            "created_at": datetime.now().isoformat()
-        }
+        return orjson.loads(_fallback_assessment_bytes(concept, subject, difficulty))
             
     async def grade_assessment(self, user_answers: List[Dict[str, Any]], assessment: Dict[str, Any]) -> Dict[str, Any]:
         """Grade user's assessment answers and provide feedback."""
-        
-        questions = assessment.get("questions", [])
-        passing_score = assessment.get("passing_score", len(questions) // 2)
-        concept = assessment.get("concept", "the concept")
-        subject = assessment.get("subject", "the subject")
-        
-        # Match user answers with questions
-        correct_count = 0
+        question_results, short_pending = self._match_answers(user_answers, assessment)
+        await self._grade_short_answers([(question_results, i) for i in short_pending])
+        return self._summarize_grading(question_results, assessment)
+    
+    async def grade_assessments_batch(self, submissions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Grade many submissions at once (e.g. re-grading runs).
+
+        Each submission is {"user_answers": [...], "assessment": {...}}. Short answers across all
+        submissions are string-checked in one batch (JIT-compiled when numba is installed) and the
+        rest share a single embedding call.
+        """
+        matched = [self._match_answers(sub.get("user_answers", []), sub.get("assessment", {})) for sub in submissions]
+        await self._grade_short_answers([
+            (question_results, i) for question_results, short_pending in matched for i in short_pending
+        ])
+        return [
+            self._summarize_grading(question_results, sub.get("assessment", {}))
+            for (question_results, _), sub in zip(matched, submissions)
+        ]
+    
+    def _match_answers(self, user_answers: List[Dict[str, Any]], assessment: Dict[str, Any]):
+        """Pair answers with questions; grade MC/TF now, return short-answer indexes to grade in bulk."""
+        questions_by_id = {q.get("id"): q for q in assessment.get("questions", [])}
         question_results = []
+        short_pending = []  # indexes into question_results of short answers
         
         for user_answer in user_answers:
             q_id = user_answer.get("id")
             answer = user_answer.get("answer")
             
             # Find matching question
-            matching_question = next((q for q in questions if q.get("id") == q_id), None)
+            matching_question = questions_by_id.get(q_id)
             
             if matching_question:
-                correct = self._check_answer(answer, matching_question)
-                
-                if correct:
-                    correct_count += 1
+                is_short = matching_question.get("type") == "short_answer"
+                if is_short:
+                    short_pending.append(len(question_results))
                 
                 question_results.append({
                     "id": q_id,
                     "question": matching_question.get("question"),
                     "user_answer": answer,
-                    "correct": correct,
+                    "correct": False if is_short else self._check_answer(answer, matching_question),
                     "correct_answer": matching_question.get("correct_answer"),
                     "explanation": matching_question.get("explanation")
                 })
+        return question_results, short_pending
+    
+    async def _grade_short_answers(self, refs: List[Tuple[List[Dict[str, Any]], int]]) -> None:
+        """Grade short answers in place: batched string check, then embeddings for the misses."""
+        if not refs:
+            return
+        results = [question_results[i] for question_results, i in refs]
+        matches = _short_answer_string_matches([(r["user_answer"], r["correct_answer"]) for r in results])
+        
+        # Grade remaining short answers by meaning: one embedding call for all pairs, one vectorized compare
+        semantic_pending = []
+        for result, matched in zip(results, matches):
+            result["correct"] = matched
+            if not matched and str(result["user_answer"] or "").strip():
+                semantic_pending.append(result)
+        if semantic_pending:
+            user_texts = [str(r["user_answer"]) for r in semantic_pending]
+            correct_texts = [str(r["correct_answer"]) for r in semantic_pending]
+            vectors = await _embed_texts(user_texts + correct_texts)
+            if vectors is not None:
+                n = len(semantic_pending)
+                sims = (vectors[:n] * vectors[n:]).sum(axis=1)
+                for result, sim in zip(semantic_pending, sims):
+                    result["correct"] = bool(sim >= SHORT_ANSWER_SIMILARITY_THRESHOLD)
+    
+    def _summarize_grading(self, question_results: List[Dict[str, Any]], assessment: Dict[str, Any]) -> Dict[str, Any]:
+        """Score, pass/fail and feedback for graded question results."""
+        questions = assessment.get("questions", [])
+        passing_score = assessment.get("passing_score", len(questions) // 2)
+        concept = assessment.get("concept", "the concept")
+        subject = assessment.get("subject", "the subject")
+        
+        correct_count = sum(1 for r in question_results if r["correct"])
         
         # Determine if passing
         passed = correct_count >= passing_score
@@ -673,6 +1209,9 @@ IMPORTANT:
 class ManagerAgent(VEDYAAgent):
     """Manager agent that coordinates and finalizes workflows."""
     
+    # Strong refs to in-flight notification tasks so they aren't garbage-collected mid-send
+    _background_tasks: set = set()
+    
     def __init__(self):
         model = os.getenv("MANAGER_AGENT_MODEL", "o4-mini")
         super().__init__("ManagerAgent", model, 0.1)
@@ -681,23 +1220,35 @@ class ManagerAgent(VEDYAAgent):
         """Coordinate final workflow steps and trigger notifications."""
         # Add final coordination tasks
         final_task = {
-            "task_id": f"task_{uuid.uuid4().hex[:8]}",
+            "task_id": _task_id("task"),
             "title": "Finalize Learning Plan",
             "status": "completed",
             "assigned_agent": "ManagerAgent",
             "priority": "high"
         }
         
-        updated_tasks = state.get("kanban_tasks", []) + [final_task]
+        # Assign identifiers here rather than in the (cached) planner node
+        learning_plan = state.get("learning_plan")
+        if learning_plan:
+            learning_plan = {
+                **learning_plan,
+                "plan_id": f"plan_user_{secrets.token_hex(3)}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                "user_id": f"user_{secrets.token_hex(4)}",
+                "created_at": datetime.now(),
+            }
         
-        # Trigger email notifications if learning plan is complete
-        await self._send_completion_notifications(state)
+        # Trigger email notifications in the background; the plan is ready without waiting on the mail provider
+        task = asyncio.create_task(self._send_completion_notifications({**state, "learning_plan": learning_plan}))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
         
         return {
-            "kanban_tasks": updated_tasks,
+            "learning_plan": learning_plan,
+            "kanban_tasks": {"ManagerAgent": final_task},
+            "current_agent": "ManagerAgent",
             "workflow_stage": "completed",
             "next_action": "end",
-            "completed_agents": state.get("completed_agents", []) + ["ManagerAgent"]
+            "completed_agents": ["ManagerAgent"]
         }
     
     async def _send_completion_notifications(self, state: WorkflowState):
@@ -734,30 +1285,30 @@ class NotificationAgent(VEDYAAgent):
     
     async def execute(self, state: WorkflowState) -> Dict[str, Any]:
         """Handle notification tasks."""
-        notification_tasks = []
+        notification_tasks = {}
         
         # Create notification tasks
         if state.get("trigger_welcome"):
-            notification_tasks.append({
-                "task_id": f"notif_{uuid.uuid4().hex[:8]}",
+            notification_tasks["NotificationAgent:welcome"] = {
+                "task_id": _task_id("notif"),
                 "title": "Send Welcome Email",
                 "status": "in_progress",
                 "assigned_agent": "NotificationAgent",
                 "priority": "medium"
-            })
+            }
         
         if state.get("trigger_plan_ready"):
-            notification_tasks.append({
-                "task_id": f"notif_{uuid.uuid4().hex[:8]}",
+            notification_tasks["NotificationAgent:plan_ready"] = {
+                "task_id": _task_id("notif"),
                 "title": "Send Learning Plan Ready Notification",
                 "status": "in_progress", 
                 "assigned_agent": "NotificationAgent",
                 "priority": "high"
-            })
+            }
         
         return {
-            "kanban_tasks": state.get("kanban_tasks", []) + notification_tasks,
-            "completed_agents": state.get("completed_agents", []) + ["NotificationAgent"],
+            "kanban_tasks": notification_tasks,
+            "completed_agents": ["NotificationAgent"],
             "next_action": "continue"
         }
     
@@ -778,6 +1329,190 @@ class NotificationAgent(VEDYAAgent):
         return await email_service.send_weekly_report(user_email, user_name, weekly_data)
 
 
+# Streamed teaching replies are re-chunked into frames of at least this many characters, or
+# whatever has arrived once the model pauses this long, instead of one SSE event per token.
+STREAM_FLUSH_CHARS = 16
+STREAM_FLUSH_INTERVAL_SECONDS = 0.02
+
+
+async def _coalesce_chunks(chunks, min_chars: int = STREAM_FLUSH_CHARS,
+                           interval: float = STREAM_FLUSH_INTERVAL_SECONDS):
+    """Buffer an LLM message-chunk stream into text frames: flush once `min_chars` are
+    buffered or when no new chunk arrives within `interval` seconds."""
+    iterator = chunks.__aiter__()
+    buffer: List[str] = []
+    size = 0
+    next_chunk = None
+    try:
+        while True:
+            if next_chunk is None:
+                next_chunk = asyncio.ensure_future(iterator.__anext__())
+            done, _ = await asyncio.wait({next_chunk}, timeout=interval if buffer else None)
+            if not done:
+                yield "".join(buffer)
+                buffer.clear()
+                size = 0
+                continue
+            try:
+                chunk = next_chunk.result()
+            except StopAsyncIteration:
+                break
+            finally:
+                next_chunk = None
+            content = getattr(chunk, "content", None)
+            if content:
+                buffer.append(content)
+                size += len(content)
+                if size >= min_chars:
+                    yield "".join(buffer)
+                    buffer.clear()
+                    size = 0
+        if buffer:
+            yield "".join(buffer)
+    finally:
+        if next_chunk is not None:
+            next_chunk.cancel()
+
+
+# Teaching-assistant system prompts. Formatted with subject, module, learning_style, difficulty
+# (and description for the session opener); the interpolated fields only change per session.
+TEACHING_SESSION_START_PROMPT = """You are an expert AI instructor teaching {subject}. 
+
+STUDENT CONTEXT:
+- Subject: {subject}
+- Learning Style: {learning_style}
+- Difficulty Level: {difficulty}
+- Current Module: {module}
+- Learning Plan: {description}
+
+TEACHING APPROACH:
+1. Be conversational and highly interactive - this is not a lecture
+2. Start by asking a question to gauge the student's prior knowledge
+3. Present information in small, digestible chunks (2-3 sentences max)
+4. After each chunk, check for understanding with a simple question
+5. Adapt your explanations based on student responses
+6. Use the student's preferred learning style ({learning_style})
+7. Adjust explanations to {difficulty} level
+8. Use concrete examples and real-world applications
+
+STRUCTURE:
+1. Begin with a brief, friendly welcome (1-2 sentences)
+2. Ask about their existing knowledge of the topic
+3. Present only ONE concept at a time
+4. Check understanding before moving to the next concept
+5. Use visual descriptions when appropriate
+
+IMPORTANT:
+- DO NOT present a full lecture with multiple sections
+- DO NOT present multiple concepts at once
+- DO NOT use numbered lists or extensive bullet points
+- DO NOT overwhelm with information
+- Keep your responses short and focused
+- Imagine you are tutoring one-on-one, not lecturing to a class
+
+Start with a warm welcome and ask about their familiarity with {module} to gauge their knowledge level."""
+
+TEACHING_CHAT_PROMPT = """You are an expert AI instructor teaching {subject}, specifically the module: {module}.
+
+CONTEXT:
+- Student's Learning Style: {learning_style}
+- Difficulty Level: {difficulty}
+- Current Focus: {module}
+
+TEACHING GUIDELINES:
+1. Be conversational and highly interactive - like a one-on-one tutor
+2. Present information in small, digestible chunks (2-3 sentences max)
+3. Analyze the student's questions to gauge their understanding
+4. If they seem confused, simplify and provide different examples
+5. If they show understanding, introduce a slightly more advanced concept
+6. Use the student's preferred learning style ({learning_style})
+7. Adjust explanations to {difficulty} level
+8. Keep all responses under 5 sentences
+
+RESPONSE INSTRUCTIONS:
+- Respond to what the student ACTUALLY asked. If they asked about an everyday object (e.g. an apple) or a simple drawing (circles, shapes), stay on that topic. Do NOT force the conversation to neural networks or AI unless they asked for that.
+- End each response with a thoughtful question to maintain dialogue
+- Use concrete examples related to the student's current topic
+- Be encouraging and supportive
+- Don't overwhelm with information
+- NEVER present multiple concepts at once
+- NEVER use extensive numbered lists or bullet points
+- NEVER respond with ASCII art or text-based drawings when they asked for an image—we show images on the blackboard instead
+
+Remember: You are having a conversation with the student, not delivering a lecture."""
+
+TEACHING_STREAM_CHAT_PROMPT = """You are an expert AI instructor teaching {subject}, specifically the module: {module}.
+
+CONTEXT:
+- Student's Learning Style: {learning_style}
+- Difficulty Level: {difficulty}
+- Current Focus: {module}
+
+TEACHING GUIDELINES:
+1. Be conversational and highly interactive - like a one-on-one tutor
+2. Present information in small, digestible chunks (2-3 sentences max)
+3. Analyze the student's questions to gauge their understanding
+4. If they seem confused, simplify and provide different examples
+5. If they show understanding, introduce a slightly more advanced concept
+6. Use the student's preferred learning style ({learning_style})
+7. Adjust explanations to {difficulty} level
+8. Keep all responses under 5 sentences
+
+RESPONSE INSTRUCTIONS:
+- End each response with a thoughtful question to maintain dialogue
+- Use concrete examples related to {subject}
+- Be encouraging and supportive
+- Don't overwhelm with information
+- NEVER present multiple concepts at once
+- NEVER use extensive numbered lists or bullet points
+- Adjust your teaching pace based on the student's responses
+
+Remember: You are having a conversation with the student, not delivering a lecture."""
+
+
+@functools.lru_cache(maxsize=512)
+def _teaching_system_prompt(template: str, subject: str, module: str, learning_style: str,
+                            difficulty: str, description: str = "") -> str:
+    return template.format(subject=subject, module=module, learning_style=learning_style,
+                           difficulty=difficulty, description=description)
+
+
+@functools.lru_cache(maxsize=512)
+def _teaching_system_message(template: str, subject: str, module: str, learning_style: str,
+                             difficulty: str, description: str = "") -> SystemMessage:
+    """Shared SystemMessage per session profile; messages are never mutated after construction."""
+    return SystemMessage(content=_teaching_system_prompt(template, subject, module, learning_style, difficulty, description))
+
+
+@functools.lru_cache(maxsize=1024)
+def _concept_key(module: str) -> str:
+    """Concept id for a module title ("Neural Networks" -> "neural_networks"), interned."""
+    return sys.intern(module.lower().replace(' ', '_'))
+
+
+# Teaching-chat triggers, matched against word tokens (and adjacent word pairs for phrases)
+_WORD_RE = re.compile(r"[a-z']+")
+_VISUAL_REQUEST_KW = frozenset({"visual", "diagram", "show", "picture", "graph", "chart", "illustration"})
+_VISUAL_RESPONSE_KW = frozenset({"diagram", "visual", "chart", "graph"})
+_ASSESS_POS = frozenset({"understand", "understood", "assessment", "test", "quiz", "check"})
+_ASSESS_POS_PHRASES = frozenset({("got", "it"), ("makes", "sense"), ("clear", "now"), ("next", "topic")})
+_ASSESS_NEG = frozenset({"confused", "unclear"})
+_ASSESS_NEG_PHRASES = frozenset({("don't", "understand"), ("explain", "again")})
+
+
+def _teaching_signals(message_lower: str, response_lower: str) -> Tuple[bool, bool]:
+    """Return (should_generate_visual, trigger_assessment) for a lowercased student message and reply."""
+    words = _WORD_RE.findall(message_lower)
+    tokens = set(words)
+    pairs = set(zip(words, words[1:]))
+    should_generate_visual = not _VISUAL_REQUEST_KW.isdisjoint(tokens) or \
+        not _VISUAL_RESPONSE_KW.isdisjoint(_WORD_RE.findall(response_lower))
+    # Trigger assessment when the student signals mastery and isn't also saying they're lost
+    trigger_assessment = (not _ASSESS_POS.isdisjoint(tokens) or not _ASSESS_POS_PHRASES.isdisjoint(pairs)) and \
+        _ASSESS_NEG.isdisjoint(tokens) and _ASSESS_NEG_PHRASES.isdisjoint(pairs)
+    return should_generate_visual, trigger_assessment
+
+
 class TeachingAssistantAgent(VEDYAAgent):
     """AI Teaching Assistant that provides real-time guidance and personalized instruction."""
     
@@ -789,21 +1524,21 @@ class TeachingAssistantAgent(VEDYAAgent):
     
     async def execute(self, state: WorkflowState) -> Dict[str, Any]:
         """Execute teaching assistance tasks."""
-        teaching_tasks = []
+        teaching_tasks = {}
         
         # Create teaching tasks based on current learning progress
         if state.get("start_teaching_session"):
-            teaching_tasks.append({
-                "task_id": f"teach_{uuid.uuid4().hex[:8]}",
+            teaching_tasks["TeachingAssistant"] = {
+                "task_id": _task_id("teach"),
                 "title": "Initialize Teaching Session",
                 "status": "in_progress",
                 "assigned_agent": "TeachingAssistant",
                 "priority": "high"
-            })
+            }
         
         return {
-            "kanban_tasks": state.get("kanban_tasks", []) + teaching_tasks,
-            "completed_agents": state.get("completed_agents", []) + ["TeachingAssistant"],
+            "kanban_tasks": teaching_tasks,
+            "completed_agents": ["TeachingAssistant"],
             "next_action": "continue"
         }
     
@@ -816,60 +1551,31 @@ class TeachingAssistantAgent(VEDYAAgent):
         difficulty = learning_plan.get('difficulty', 'Intermediate')
         current_module = learning_plan.get('modules', [{}])[0].get('title', 'Introduction')
         
-        system_prompt = f"""You are an expert AI instructor teaching {subject}. 
-
-STUDENT CONTEXT:
-- Subject: {subject}
-- Learning Style: {learning_style}
-- Difficulty Level: {difficulty}
-- Current Module: {current_module}
-- Learning Plan: {learning_plan.get('description', 'Comprehensive learning curriculum')}
-
-TEACHING APPROACH:
-1. Be conversational and highly interactive - this is not a lecture
-2. Start by asking a question to gauge the student's prior knowledge
-3. Present information in small, digestible chunks (2-3 sentences max)
-4. After each chunk, check for understanding with a simple question
-5. Adapt your explanations based on student responses
-6. Use the student's preferred learning style ({learning_style})
-7. Adjust explanations to {difficulty} level
-8. Use concrete examples and real-world applications
-
-STRUCTURE:
-1. Begin with a brief, friendly welcome (1-2 sentences)
-2. Ask about their existing knowledge of the topic
-3. Present only ONE concept at a time
-4. Check understanding before moving to the next concept
-5. Use visual descriptions when appropriate
-
-IMPORTANT:
-- DO NOT present a full lecture with multiple sections
-- DO NOT present multiple concepts at once
-- DO NOT use numbered lists or extensive bullet points
-- DO NOT overwhelm with information
-- Keep your responses short and focused
-- Imagine you are tutoring one-on-one, not lecturing to a class
-
-Start with a warm welcome and ask about their familiarity with {current_module} to gauge their knowledge level."""
+        system_message = _teaching_system_message(
+            TEACHING_SESSION_START_PROMPT, subject, current_module, learning_style, difficulty,
+            learning_plan.get('description', 'Comprehensive learning curriculum'),
+        )
 
         try:
             messages = [
-                SystemMessage(content=system_prompt),
+                system_message,
                 HumanMessage(content=f"Start teaching session for {current_module} in {subject}")
             ]
             
             response = await self.llm.ainvoke(messages)
             
+            current_concept = _concept_key(current_module)
             return {
                 "success": True,
                 "initial_message": response.content,
-                "current_concept": current_module.lower().replace(' ', '_'),
+                "current_concept": current_concept,
                 "plan_data": learning_plan,
                 "session_context": {
                     "subject": subject,
                     "module": current_module,
                     "learning_style": learning_style,
-                    "difficulty": difficulty
+                    "difficulty": difficulty,
+                    "current_concept": current_concept
                 }
             }
             
@@ -892,15 +1598,17 @@ Start with a warm welcome and ask about their familiarity with {current_module}
         learning_style = session_context.get('learning_style', 'Mixed')
         difficulty = session_context.get('difficulty', 'Intermediate')
         
+        message_lower = message.lower()
+        
         # Keep track of conversation context in memory (would be DB in production)
-        if message.lower() in ["exit", "quit", "end session"]:
+        if message_lower in ["exit", "quit", "end session"]:
             # Trigger assessment if user indicates they're done with the current topic
             return {
                 "success": True,
                 "response": "Let's check your understanding of what we've covered so far before moving on.",
                 "type": "text",
                 "trigger_assessment": True,
-                "current_concept": session_context.get('current_concept', current_module.lower().replace(' ', '_'))
+                "current_concept": session_context.get('current_concept') or _concept_key(current_module)
             }
         
         # If the user is submitting a "pointing" answer (they marked an area and want us to evaluate)
@@ -952,34 +1660,7 @@ We are already displaying that drawing on the BLACKBOARD (the panel next to this
 - Stay on the student's topic. If they asked for circles and a line (or an apple, or a simple shape), do NOT pivot to neural networks or AI unless they explicitly asked about that.
 - End with one brief, relevant question if natural (e.g. "What would you like to try next?" or "Want me to draw something else?")."""
         else:
-            system_prompt = f"""You are an expert AI instructor teaching {subject}, specifically the module: {current_module}.
-
-CONTEXT:
-- Student's Learning Style: {learning_style}
-- Difficulty Level: {difficulty}
-- Current Focus: {current_module}
-
-TEACHING GUIDELINES:
-1. Be conversational and highly interactive - like a one-on-one tutor
-2. Present information in small, digestible chunks (2-3 sentences max)
-3. Analyze the student's questions to gauge their understanding
-4. If they seem confused, simplify and provide different examples
-5. If they show understanding, introduce a slightly more advanced concept
-6. Use the student's preferred learning style ({learning_style})
-7. Adjust explanations to {difficulty} level
-8. Keep all responses under 5 sentences
-
-RESPONSE INSTRUCTIONS:
-- Respond to what the student ACTUALLY asked. If they asked about an everyday object (e.g. an apple) or a simple drawing (circles, shapes), stay on that topic. Do NOT force the conversation to neural networks or AI unless they asked for that.
-- End each response with a thoughtful question to maintain dialogue
-- Use concrete examples related to the student's current topic
-- Be encouraging and supportive
-- Don't overwhelm with information
-- NEVER present multiple concepts at once
-- NEVER use extensive numbered lists or bullet points
-- NEVER respond with ASCII art or text-based drawings when they asked for an image—we show images on the blackboard instead
-
-Remember: You are having a conversation with the student, not delivering a lecture."""
+            system_prompt = _teaching_system_prompt(TEACHING_CHAT_PROMPT, subject, current_module, learning_style, difficulty)
 
         try:
             if image_base64:
@@ -999,24 +1680,14 @@ Remember: You are having a conversation with the student, not delivering a lectu
             
             response = await self.llm.ainvoke(messages)
             
-            # Determine if response should trigger visual generation
-            message_lower = message.lower()
-            response_lower = response.content.lower()
-            
-            should_generate_visual = any(keyword in message_lower for keyword in 
-                ['visual', 'diagram', 'show', 'picture', 'graph', 'chart', 'illustration']) or \
-                any(keyword in response_lower for keyword in ['diagram', 'visual', 'chart', 'graph'])
-            
-            # Check if we should trigger assessment based on student's apparent mastery
-            trigger_assessment = any(keyword in message_lower for keyword in 
-                ['understand', 'got it', 'makes sense', 'clear now', 'next topic', 'understood', 'assessment', 'test', 'quiz', 'check']) and \
-                not any(keyword in message_lower for keyword in ['don\'t understand', 'confused', 'unclear', 'explain again'])
+            # Decide on visual generation and assessment from the student's message and our reply
+            should_generate_visual, trigger_assessment = _teaching_signals(message_lower, response.content.lower())
             
             return {
                 "success": True,
                 "response": response.content,
                 "type": "text",
-                "current_concept": session_context.get('current_concept', current_module.lower().replace(' ', '_')),
+                "current_concept": session_context.get('current_concept') or _concept_key(current_module),
                 "should_generate_visual": should_generate_visual,
                 "suggested_visual_type": "concept_diagram" if should_generate_visual else None,
                 "trigger_assessment": trigger_assessment
@@ -1032,15 +1703,15 @@ Remember: You are having a conversation with the student, not delivering a lectu
     
     async def stream_teaching_chat(self, message: str, session_context: Dict[str, Any]):
         """Handle teaching conversation with streaming support."""
-        from streaming_utils import stream_text_chunks
-        
         subject = session_context.get('subject', 'the subject')
         current_module = session_context.get('module', 'this topic')
         learning_style = session_context.get('learning_style', 'Mixed')
         difficulty = session_context.get('difficulty', 'Intermediate')
         
+        message_lower = message.lower()
+        
         # Check for exit commands to trigger assessment
-        if message.lower() in ["exit", "quit", "end session"]:
+        if message_lower in ["exit", "quit", "end session"]:
             yield {
                 "type": "content",
                 "content": "Let's check your understanding of what we've covered so far before moving on.",
@@ -1049,77 +1720,39 @@ Remember: You are having a conversation with the student, not delivering a lectu
             
             yield {
                 "type": "metadata",
-                "current_concept": session_context.get('current_concept', current_module.lower().replace(' ', '_')),
+                "current_concept": session_context.get('current_concept') or _concept_key(current_module),
                 "should_generate_visual": False,
                 "trigger_assessment": True,
                 "full_response": "Let's check your understanding of what we've covered so far before moving on."
             }
             return
         
-        system_prompt = f"""You are an expert AI instructor teaching {subject}, specifically the module: {current_module}.
-
-CONTEXT:
-- Student's Learning Style: {learning_style}
-- Difficulty Level: {difficulty}
-- Current Focus: {current_module}
-
-TEACHING GUIDELINES:
-1. Be conversational and highly interactive - like a one-on-one tutor
-2. Present information in small, digestible chunks (2-3 sentences max)
-3. Analyze the student's questions to gauge their understanding
-4. If they seem confused, simplify and provide different examples
-5. If they show understanding, introduce a slightly more advanced concept
-6. Use the student's preferred learning style ({learning_style})
-7. Adjust explanations to {difficulty} level
-8. Keep all responses under 5 sentences
-
-RESPONSE INSTRUCTIONS:
-- End each response with a thoughtful question to maintain dialogue
-- Use concrete examples related to {subject}
-- Be encouraging and supportive
-- Don't overwhelm with information
-- NEVER present multiple concepts at once
-- NEVER use extensive numbered lists or bullet points
-- Adjust your teaching pace based on the student's responses
-
-Remember: You are having a conversation with the student, not delivering a lecture."""
+        system_message = _teaching_system_message(TEACHING_STREAM_CHAT_PROMPT, subject, current_module, learning_style, difficulty)
 
         try:
             messages = [
-                SystemMessage(content=system_prompt),
+                system_message,
                 HumanMessage(content=f"Student says: {message}")
             ]
             
-            # First, get the complete response from the LLM
-            full_response = ""
-            async for chunk in self.llm.astream(messages):
-                if hasattr(chunk, 'content') and chunk.content:
-                    full_response += chunk.content
-            
-            # Then stream it character by character for a ChatGPT-like experience
-            accumulated_content = ""
-            async for char in stream_text_chunks(full_response, character_by_character=True):
-                accumulated_content += char
+            # Forward the response as the model produces it, in small coalesced frames. Frames carry
+            # only the new text; the full response goes out once, in the metadata frame.
+            parts = []
+            async for text in _coalesce_chunks(self.llm.astream(messages)):
+                parts.append(text)
                 yield {
                     "type": "content",
-                    "content": char,
-                    "accumulated": accumulated_content
+                    "content": text,
+                    "accumulated": None
                 }
+            accumulated_content = "".join(parts)
             
             # Send final metadata
-            message_lower = message.lower()
-            should_generate_visual = any(keyword in message_lower for keyword in 
-                ['visual', 'diagram', 'show', 'picture', 'graph', 'chart', 'illustration']) or \
-                any(keyword in accumulated_content.lower() for keyword in ['diagram', 'visual', 'chart', 'graph'])
-            
-            # Check if we should trigger assessment based on student's apparent mastery
-            trigger_assessment = any(keyword in message_lower for keyword in 
-                ['understand', 'got it', 'makes sense', 'clear now', 'next topic', 'understood', 'assessment', 'test', 'quiz', 'check']) and \
-                not any(keyword in message_lower for keyword in ['don\'t understand', 'confused', 'unclear', 'explain again'])
+            should_generate_visual, trigger_assessment = _teaching_signals(message_lower, accumulated_content.lower())
             
             yield {
                 "type": "metadata",
-                "current_concept": session_context.get('current_concept', current_module.lower().replace(' ', '_')),
+                "current_concept": session_context.get('current_concept') or _concept_key(current_module),
                 "should_generate_visual": should_generate_visual,
                 "suggested_visual_type": "concept_diagram" if should_generate_visual else None,
                 "trigger_assessment": trigger_assessment,
@@ -1134,16 +1767,88 @@ Remember: You are having a conversation with the student, not delivering a lectu
             }
 
 
+# Image prompt templates per visual type, formatted with concept and subject
+_PROMPT_TEMPLATES = MappingProxyType({
+    "concept_illustration": "Educational illustration of {concept} in {subject}. Clean, academic style with clear labels and educational focus. Professional textbook quality.",
+    "flowchart": "Clear flowchart diagram showing {concept} process in {subject}. Use arrows, boxes, and clear text labels. Professional educational style.",
+    "mind_map": "Educational mind map for {concept} in {subject}. Central topic with branching subtopics, clear hierarchy, colorful but professional.",
+    "scientific_visualization": "Scientific diagram of {concept} in {subject}. Accurate, detailed, with proper labels and annotations. Academic journal quality.",
+    "comparison_chart": "Educational comparison chart for {concept} in {subject}. Clear columns, readable text, professional academic presentation.",
+    "process_explanation": "Step-by-step visual explanation of {concept} in {subject}. Sequential panels with clear progression and educational annotations.",
+})
+_DEFAULT_PROMPT_TEMPLATE = "Educational diagram of {concept} in {subject}. Clean, clear, academic style."
+
+# Placeholder diagram accent color per (lowercased) subject
+_SUBJECT_COLORS = MappingProxyType({
+    'artificial intelligence': '4F46E5',
+    'computer science': '059669',
+    'mathematics': 'DC2626',
+    'physics': '7C3AED',
+    'chemistry': 'EA580C',
+    'biology': '16A34A',
+    'history': '92400E',
+    'literature': 'BE185D',
+})
+_DEFAULT_SUBJECT_COLOR = '6366F1'
+
+_PLACEHOLDER_SUBTITLES = MappingProxyType({
+    "flowchart": "Flowchart · Process Visualization",
+    "mind_map": "Mind Map · Core Concept",
+    "comparison_chart": "Comparison Chart",
+})
+
+def _create_image_gen_log() -> logging.Logger:
+    """Audit logger for image generation: records go through a queue and are written by a
+    background thread, to IMAGE_GEN_LOG_FILE (rotating) if set, else stdout."""
+    log_file = os.getenv("IMAGE_GEN_LOG_FILE")
+    if log_file:
+        target = logging.handlers.RotatingFileHandler(log_file, maxBytes=10 * 1024 * 1024, backupCount=5)
+    else:
+        target = logging.StreamHandler(sys.stdout)
+    target.setFormatter(logging.Formatter("%(message)s"))
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, target)
+    listener.start()
+    atexit.register(listener.stop)
+
+    log = logging.getLogger("vedya.image_gen")
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    log.addHandler(logging.handlers.QueueHandler(log_queue))
+    return log
+
+
+_image_gen_log = _create_image_gen_log()
+
+# Generated images by blake2b(prompt): (expires_at, data URL), LRU order. Each entry is a ~2MB
+# base64 PNG, so the bound is kept small.
+IMAGE_CACHE_TTL_SECONDS = 86400
+IMAGE_CACHE_MAX_ENTRIES = int(os.getenv("IMAGE_CACHE_MAX_ENTRIES", "128"))
+_IMAGE_CACHE: "OrderedDict[str, tuple]" = OrderedDict()
+_IMAGE_INFLIGHT: Dict[str, asyncio.Future] = {}
+
+_APPROVED_TYPES = frozenset({
+    "educational_diagram", "concept_illustration", "flowchart", "mind_map",
+    "scientific_visualization", "mathematical_graph", "historical_timeline",
+    "process_explanation", "comparison_chart", "organizational_structure",
+})
+_PROHIBITED = frozenset({"inappropriate", "offensive", "violent", "adult", "graphic"})
+
+
+@functools.lru_cache(maxsize=4096)
+def _educational_prompt(concept: str, subject: str, visual_type: str) -> str:
+    return _PROMPT_TEMPLATES.get(visual_type, _DEFAULT_PROMPT_TEMPLATE).format(concept=concept, subject=subject)
+
+
 class ImageGenerationAssistant(VEDYAAgent):
     """Supervised AI assistant for generating educational images and diagrams."""
     
     def __init__(self):
         super().__init__("ImageGenerationAssistant", "gpt-4o", 0.1)  # Low temperature for consistency
-        self.approved_content_types = [
-            "educational_diagram", "concept_illustration", "flowchart", "mind_map", 
-            "scientific_visualization", "mathematical_graph", "historical_timeline",
-            "process_explanation", "comparison_chart", "organizational_structure"
-        ]
+    
+    @property
+    def approved_content_types(self) -> frozenset:
+        return _APPROVED_TYPES
     
     async def execute(self, state: WorkflowState) -> Dict[str, Any]:
         """Execute image generation tasks under supervision."""
@@ -1193,46 +1898,34 @@ class ImageGenerationAssistant(VEDYAAgent):
     
     def _validate_educational_request(self, concept: str, subject: str, visual_type: str, 
                                     supervisor_context: Dict[str, Any]) -> bool:
-        """Validate that the request is for legitimate educational content."""
+        """Validate that the request is for legitimate educational content.
         
-        # Check if visual type is approved
-        if visual_type not in self.approved_content_types:
-            return False
+        Checks run cheapest first: context flags, visual type, concept keywords, then the subject match.
+        """
         
         # Check if request comes from teaching context
-        teaching_session = supervisor_context.get('teaching_session', False)
-        authorized_agent = supervisor_context.get('requesting_agent') == 'TeachingAssistant'
-        
-        if not (teaching_session and authorized_agent):
+        if not (supervisor_context.get('teaching_session', False)
+                and supervisor_context.get('requesting_agent') == 'TeachingAssistant'):
             return False
         
-        # Check if concept relates to the subject being taught
-        current_subject = supervisor_context.get('current_subject', '').lower()
-        if current_subject and current_subject not in subject.lower():
+        # Check if visual type is approved
+        if visual_type not in _APPROVED_TYPES:
             return False
         
         # Additional content validation
-        prohibited_keywords = ['inappropriate', 'offensive', 'violent', 'adult', 'graphic']
-        concept_lower = concept.lower()
+        if not _PROHIBITED.isdisjoint(_WORD_RE.findall(concept.lower())):
+            return False
         
-        if any(keyword in concept_lower for keyword in prohibited_keywords):
+        # Check if concept relates to the subject being taught
+        current_subject = supervisor_context.get('current_subject', '').lower()
+        if current_subject and current_subject not in subject.lower():
             return False
         
         return True
     
     def _create_educational_prompt(self, concept: str, subject: str, visual_type: str) -> str:
         """Create educational-focused prompt for image generation."""
-        
-        prompts = {
-            "concept_illustration": f"Educational illustration of {concept} in {subject}. Clean, academic style with clear labels and educational focus. Professional textbook quality.",
-            "flowchart": f"Clear flowchart diagram showing {concept} process in {subject}. Use arrows, boxes, and clear text labels. Professional educational style.",
-            "mind_map": f"Educational mind map for {concept} in {subject}. Central topic with branching subtopics, clear hierarchy, colorful but professional.",
-            "scientific_visualization": f"Scientific diagram of {concept} in {subject}. Accurate, detailed, with proper labels and annotations. Academic journal quality.",
-            "comparison_chart": f"Educational comparison chart for {concept} in {subject}. Clear columns, readable text, professional academic presentation.",
-            "process_explanation": f"Step-by-step visual explanation of {concept} in {subject}. Sequential panels with clear progression and educational annotations."
-        }
-        
-        return prompts.get(visual_type, f"Educational diagram of {concept} in {subject}. Clean, clear, academic style.")
+        return _educational_prompt(concept, subject, visual_type)
     
     async def _generate_image_openai(self, prompt: str) -> Optional[str]:
         """Generate an image using OpenAI DALL·E 3. Returns a data URL or None on failure."""
@@ -1241,58 +1934,66 @@ class ImageGenerationAssistant(VEDYAAgent):
             print("⚠️ OPENAI_API_KEY missing or invalid, skipping DALL·E")
             return None
 
-        def _call_dalle() -> Optional[str]:
-            try:
-                client = openai.OpenAI(api_key=api_key)
-                # DALL·E 3: sync API only; keep prompt within length/safety
-                safe_prompt = (prompt or "Educational diagram")[:4000]
-                resp = client.images.generate(
-                    model="dall-e-3",
-                    prompt=safe_prompt,
-                    size="1024x1024",
-                    quality="standard",
-                    response_format="b64_json",
-                    style="natural",
-                    n=1,
-                )
-                if not resp.data or len(resp.data) == 0:
-                    return None
-                b64 = getattr(resp.data[0], "b64_json", None)
-                if not b64:
-                    return None
-                return f"data:image/png;base64,{b64}"
-            except Exception as e:
-                print(f"⚠️ DALL·E generation failed: {e}")
-                return None
-
+        # Keep prompt within length/safety
+        safe_prompt = (prompt or "Educational diagram")[:4000]
+        key = hashlib.blake2b(safe_prompt.encode("utf-8"), digest_size=16).hexdigest()
+        
+        cached = _IMAGE_CACHE.get(key)
+        if cached is not None:
+            if cached[0] > time.monotonic():
+                _IMAGE_CACHE.move_to_end(key)
+                return cached[1]
+            del _IMAGE_CACHE[key]
+        
+        # Identical prompts already being generated share that request's result
+        inflight = _IMAGE_INFLIGHT.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+        
+        future = asyncio.get_running_loop().create_future()
+        _IMAGE_INFLIGHT[key] = future
+        visual_url = None
+        try:
+            visual_url = await self._request_image(safe_prompt)
+        finally:
+            del _IMAGE_INFLIGHT[key]
+            future.set_result(visual_url)
+        if visual_url:
+            _IMAGE_CACHE[key] = (time.monotonic() + IMAGE_CACHE_TTL_SECONDS, visual_url)
+            if len(_IMAGE_CACHE) > IMAGE_CACHE_MAX_ENTRIES:
+                _IMAGE_CACHE.popitem(last=False)
+        return visual_url
+    
+    async def _request_image(self, safe_prompt: str) -> Optional[str]:
+        """Call DALL·E 3 for one prompt. Returns a data URL or None on failure."""
+        client = _get_openai_async_client()
+        if client is None:
+            return None
         try:
-            return await asyncio.to_thread(_call_dalle)
+            resp = await client.images.generate(
+                model="dall-e-3",
+                prompt=safe_prompt,
+                size="1024x1024",
+                quality="standard",
+                response_format="b64_json",
+                style="natural",
+                n=1,
+            )
+            if not resp.data or len(resp.data) == 0:
+                return None
+            b64 = getattr(resp.data[0], "b64_json", None)
+            if not b64:
+                return None
+            return f"data:image/png;base64,{b64}"
         except Exception as e:
-            print(f"⚠️ DALL·E task failed: {e}")
+            print(f"⚠️ DALL·E generation failed: {e}")
             return None
 
     def _generate_contextual_placeholder(self, concept: str, subject: str, visual_type: str) -> str:
         """Generate inline SVG diagram (data URL). No external image service required."""
-        from diagram_utils import make_diagram_data_url
-
-        subject_colors = {
-            'artificial intelligence': '4F46E5',
-            'computer science': '059669',
-            'mathematics': 'DC2626',
-            'physics': '7C3AED',
-            'chemistry': 'EA580C',
-            'biology': '16A34A',
-            'history': '92400E',
-            'literature': 'BE185D',
-        }
-        color = subject_colors.get(subject.lower(), '6366F1')
-        if visual_type == "flowchart":
-            return make_diagram_data_url(concept, subject, "Flowchart · Process Visualization", color)
-        if visual_type == "mind_map":
-            return make_diagram_data_url(concept, subject, "Mind Map · Core Concept", color)
-        if visual_type == "comparison_chart":
-            return make_diagram_data_url(concept, subject, "Comparison Chart", color)
-        return make_diagram_data_url(concept, subject, "Educational Diagram", color)
+        color = _SUBJECT_COLORS.get(subject.lower(), _DEFAULT_SUBJECT_COLOR)
+        subtitle = _PLACEHOLDER_SUBTITLES.get(visual_type, "Educational Diagram")
+        return make_diagram_data_url(concept, subject, subtitle, color)
     
     async def _log_generation_request(self, concept: str, subject: str, visual_type: str, 
                                     supervisor_context: Dict[str, Any]) -> None:
@@ -1308,8 +2009,8 @@ class ImageGenerationAssistant(VEDYAAgent):
             "student_context": supervisor_context.get('student_context', {})
         }
         
-        # In production, this would write to a proper logging system
-        print(f"🎨 Image Generation Log: {json.dumps(log_entry, indent=2)}")
+        # Handed to the background listener; the event loop never blocks on the write
+        _image_gen_log.info("🎨 Image Generation Log: %s", orjson.dumps(log_entry, default=str).decode())
     
     async def generate_teaching_visual(self, concept: str, visual_type: str, 
                                     supervisor_context: Dict[str, Any] = None) -> Dict[str, Any]:
@@ -1317,15 +2018,13 @@ class ImageGenerationAssistant(VEDYAAgent):
         
         This is the main entry point used by the API server to generate visuals for the teaching interface.
         """
-        import uuid
-        
         # Default supervisor context if not provided
         if supervisor_context is None:
             supervisor_context = {
                 "teaching_session": True,
                 "requesting_agent": "TeachingAssistant",
                 "current_subject": "Artificial Intelligence",
-                "session_id": f"session_{uuid.uuid4().hex[:8]}",
+                "session_id": _task_id("session"),
                 "student_context": {"subject": "Artificial Intelligence"}
             }
             
@@ -1338,15 +2037,121 @@ class ImageGenerationAssistant(VEDYAAgent):
         return await self.generate_educational_visual(concept, subject, visual_type, supervisor_context)
 
 
+# Repeat learning requests are served from a per-system response cache for this long
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "600"))
+RESPONSE_CACHE_MAX_ENTRIES = 10_000
+
+
+_DEFAULT_NEXT_STEPS = (
+    "Review your personalized learning plan",
+    "Start with the first module",
+    "Complete initial assessment",
+)
+_DEFAULT_AI_OBSERVATIONS = (
+    "Learning style preferences detected",
+    "Optimal timeline calculated",
+    "Content curated for your level",
+)
+
+
+def _email_summary(subject: str) -> Dict[str, Any]:
+    """Email summary for a plan subject; built fresh so callers may mutate it."""
+    return {
+        "subject": f"Your {subject} Learning Plan is Ready!",
+        "next_steps": list(_DEFAULT_NEXT_STEPS),
+        "ai_observations": list(_DEFAULT_AI_OBSERVATIONS),
+        "progress_rating": 8.5
+    }
+
+
+WORKFLOW_GRAPH_ASCII = """
+🔄 VEDYA LangGraph Workflow:
+
+    ┌─────────────┐
+    │ Supervisor  │
+    │   Agent     │
+    └──────┬──────┘
+           │
+    ┌──────▼──────┐
+    │   Planner   │
+    │    Agent    │
+    └──────┬──────┘
+     ┌─────┴──────────────┐
+┌────▼────────┐    ┌──────▼──────┐
+│  Content    │    │ Assessment  │
+│  Curator    │    │   Agent     │
+└────┬────────┘    └──────┬──────┘
+     └─────┬──────────────┘
+    ┌──────▼──────┐
+    │  Manager    │
+    │   Agent     │
+    └──────┬──────┘
+           │
+        ┌──▼──┐
+        │ END │
+        └─────┘
+
+State Management: LangGraph Checkpointing
+Tool Integration: LangChain Tools
+Coordination: Shared State Graph
+"""
+
+
+def _project_state(state: Dict[str, Any], status: str) -> Dict[str, Any]:
+    """Caller-facing view of a workflow state snapshot."""
+    return {
+        "learning_plan": state.get("learning_plan"),
+        "kanban_tasks": list(state.get("kanban_tasks", {}).values()),
+        "completed_agents": state.get("completed_agents", []),
+        "workflow_stage": state.get("workflow_stage"),
+        "status": status,
+    }
+
+
+# SQLite checkpoint file when checkpoint_type is "sqlite" and database_url is not itself SQLite
+CHECKPOINT_DB = os.getenv("CHECKPOINT_DB", "vedya_checkpoints.db")
+
+# Fields every run starts with. The empty kanban_tasks/completed_agents containers are shared
+# between runs; their reducers always build new objects, so they are never mutated.
+_INITIAL_STATE_TEMPLATE = MappingProxyType({
+    "learning_objective": None,
+    "learning_plan": None,
+    "kanban_tasks": {},
+    "current_agent": "supervisor",
+    "workflow_stage": "initialization",
+    "completed_agents": [],
+    "next_action": "start",
+})
+
+
 class VEDYALangGraphSystem:
     """Main VEDYA system using LangGraph for workflow orchestration."""
     
     def __init__(self, config: Dict[str, Any]):
         self.config = config
-        self.checkpointer = MemorySaver()
+        self.checkpointer = self._create_checkpointer()
+        self.node_cache = InMemoryCache()
+        # Finished workflow results by request key: (expires_at, result without thread_id), LRU order
+        self._response_cache: "OrderedDict[str, tuple]" = OrderedDict()
         self.agents = self._initialize_agents()
         self.workflow = self._create_workflow()
         
+    def _create_checkpointer(self):
+        """In-memory checkpoints by default; with checkpoint_type "sqlite", a durable SQLite (WAL)
+        checkpointer so interrupted workflows can resume after a restart."""
+        if self.config.get("checkpoint_type") != "sqlite":
+            return MemorySaver()
+        try:
+            import aiosqlite
+            from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+        except ImportError:
+            print("⚠️ langgraph-checkpoint-sqlite not installed, using in-memory checkpoints")
+            return MemorySaver()
+        database_url = self.config.get("database_url", "")
+        path = database_url[len("sqlite:///"):] if database_url.startswith("sqlite:///") else CHECKPOINT_DB
+        # The saver opens the connection and enables WAL on first use
+        return AsyncSqliteSaver(aiosqlite.connect(path))
+    
     def _initialize_agents(self) -> Dict[str, VEDYAAgent]:
         """Initialize all agents."""
         return {
@@ -1365,167 +2170,141 @@ class VEDYALangGraphSystem:
         workflow = StateGraph(WorkflowState)
         
         # Add nodes for each agent
-        workflow.add_node("supervisor", self._supervisor_node)
-        workflow.add_node("planner", self._planner_node)
-        workflow.add_node("content_curator", self._content_curator_node)
-        workflow.add_node("assessment", self._assessment_node)
-        workflow.add_node("manager", self._manager_node)
+        plan_cache = CachePolicy(key_func=_learning_objective_cache_key, ttl=PLAN_NODE_CACHE_TTL_SECONDS)
+        node_cache_policies = {"planner": plan_cache, "content_curator": plan_cache}
+        for name in ("supervisor", "planner", "content_curator", "assessment", "manager"):
+            workflow.add_node(name, functools.partial(self._run_agent, name), cache_policy=node_cache_policies.get(name))
         
         # Define workflow edges
         workflow.set_entry_point("supervisor")
         workflow.add_edge("supervisor", "planner")
-        workflow.add_edge("planner", "content_curator")
-        workflow.add_edge("content_curator", "assessment")
-        workflow.add_edge("assessment", "manager")
+        if self.config.get("langgraph", {}).get("parallel_execution", True):
+            # Content curation and assessment only depend on the plan: fan out, then join at manager
+            workflow.add_edge("planner", "content_curator")
+            workflow.add_edge("planner", "assessment")
+            workflow.add_edge(["content_curator", "assessment"], "manager")
+        else:
+            workflow.add_edge("planner", "content_curator")
+            workflow.add_edge("content_curator", "assessment")
+            workflow.add_edge("assessment", "manager")
         workflow.add_edge("manager", END)
         
-        return workflow.compile(checkpointer=self.checkpointer)
-    
-    async def _supervisor_node(self, state: WorkflowState) -> WorkflowState:
-        """Execute supervisor agent."""
-        result = await self.agents["supervisor"].execute(state)
-        state.update(result)
-        return state
-    
-    async def _planner_node(self, state: WorkflowState) -> WorkflowState:
-        """Execute planner agent."""
-        result = await self.agents["planner"].execute(state)
-        state.update(result)
-        return state
-    
-    async def _content_curator_node(self, state: WorkflowState) -> WorkflowState:
-        """Execute content curator agent."""
-        result = await self.agents["content_curator"].execute(state)
-        state.update(result)
-        return state
+        return workflow.compile(checkpointer=self.checkpointer, cache=self.node_cache)
     
-    async def _assessment_node(self, state: WorkflowState) -> WorkflowState:
-        """Execute assessment agent."""
-        result = await self.agents["assessment"].execute(state)
-        state.update(result)
-        return state
+    async def _run_agent(self, name: str, state: WorkflowState) -> Dict[str, Any]:
+        """Execute one agent as a graph node; bound per node with functools.partial."""
+        return await self.agents[name].execute(state)
     
-    async def _manager_node(self, state: WorkflowState) -> WorkflowState:
-        """Execute manager agent."""
-        result = await self.agents["manager"].execute(state)
-        state.update(result)
-        return state
+    def _response_cache_key(self, user_input: str, user_id: Optional[str]) -> str:
+        payload = {"input": user_input, "uid": user_id, "models": self.config.get("models")}
+        return hashlib.sha256(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
     
     async def process_learning_request(self, user_input: str, user_id: str = None) -> Dict[str, Any]:
-        """Process a learning request through the agent workflow."""
-        thread_id = f"thread_{user_id or 'user'}_{uuid.uuid4().hex[:6]}_{datetime.now().isoformat()}"
+        """Process a learning request through the agent workflow and return the final result.
         
-        # Initial state
-        initial_state = WorkflowState(
-            messages=[HumanMessage(content=user_input)],
-            learning_objective=None,
-            learning_plan=None,
-            kanban_tasks=[],
-            current_agent="supervisor",
-            workflow_stage="initialization",
-            thread_id=thread_id,
-            completed_agents=[],
-            next_action="start"
-        )
+        Thin wrapper over process_learning_request_stream that keeps only the terminal frame.
+        """
+        result = None
+        async for result in self.process_learning_request_stream(user_input, user_id):
+            pass
+        return result
+    
+    async def process_learning_request_stream(self, user_input: str, user_id: str = None) -> AsyncIterator[Dict[str, Any]]:
+        """Process a learning request, yielding a partial result after each agent step.
         
-        # Execute workflow
-        config = {"configurable": {"thread_id": thread_id}}
-        final_state = await self.workflow.ainvoke(initial_state, config)
+        Intermediate frames carry status "in_progress"; the last frame has status "completed" and is
+        what process_learning_request returns. Identical requests (same input, user and model config)
+        within RESPONSE_CACHE_TTL_SECONDS are answered from the response cache without running the
+        graph and yield a single completed frame.
+        """
+        # Process prefix + counter + wall-clock ns: unique without a urandom read or datetime formatting
+        thread_id = f"thread_{user_id or 'user'}_{_PROC_PREFIX}{next(_TASK_SEQ):06x}_{time.time_ns():x}"
+        
+        cache_key = self._response_cache_key(user_input, user_id)
+        cached = self._response_cache.get(cache_key)
+        if cached is not None:
+            if cached[0] > time.monotonic():
+                self._response_cache.move_to_end(cache_key)
+                yield {"thread_id": thread_id, **copy.deepcopy(cached[1])}
+                return
+            del self._response_cache[cache_key]
         
-        return {
+        # Initial state
+        initial_state: WorkflowState = {
+            **_INITIAL_STATE_TEMPLATE,
+            "messages": [HumanMessage(content=user_input)],
             "thread_id": thread_id,
-            "learning_plan": final_state.get("learning_plan"),
-            "kanban_tasks": final_state.get("kanban_tasks", []),
-            "completed_agents": final_state.get("completed_agents", []),
-            "workflow_stage": final_state.get("workflow_stage"),
-            "status": "completed"
         }
+        
+        # Execute workflow
+        final_state = initial_state
+        async for final_state in self.workflow.astream(
+            initial_state, {"configurable": {"thread_id": thread_id}}, stream_mode="values"
+        ):
+            yield {"thread_id": thread_id, **_project_state(final_state, "in_progress")}
+        
+        result = _project_state(final_state, "completed")
+        self._cache_response(cache_key, result)
+        yield {"thread_id": thread_id, **result}
+    
+    async def process_learning_requests_batch(self, inputs: List[Tuple[str, Optional[str]]]) -> List[Dict[str, Any]]:
+        """Process many (user_input, user_id) requests concurrently, at most config['parallelism']
+        (default 8) at a time. Results are returned in input order."""
+        semaphore = asyncio.Semaphore(self.config.get("parallelism", 8))
+        
+        async def _one(user_input: str, user_id: Optional[str]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.process_learning_request(user_input, user_id)
+        
+        return await asyncio.gather(*[_one(user_input, user_id) for user_input, user_id in inputs])
+    
+    def _cache_response(self, cache_key: str, result: Dict[str, Any]) -> None:
+        self._response_cache[cache_key] = (time.monotonic() + RESPONSE_CACHE_TTL_SECONDS, copy.deepcopy(result))
+        if len(self._response_cache) > RESPONSE_CACHE_MAX_ENTRIES:
+            self._response_cache.popitem(last=False)
     
     def generate_email_summary(self, result: Dict[str, Any]) -> Dict[str, Any]:
         """Generate email summary from workflow result."""
-        learning_plan = result.get("learning_plan", {})
-        subject = learning_plan.get("objectives", {}).get("subject", "Learning")
-        
-        return {
-            "subject": f"Your {subject} Learning Plan is Ready!",
-            "next_steps": [
-                "Review your personalized learning plan",
-                "Start with the first module",
-                "Complete initial assessment"
-            ],
-            "ai_observations": [
-                "Learning style preferences detected",
-                "Optimal timeline calculated",
-                "Content curated for your level"
-            ],
-            "progress_rating": 8.5
-        }
+        try:
+            subject = result["learning_plan"]["objectives"]["subject"]
+        except (KeyError, TypeError):
+            subject = "Learning"
+        return _email_summary(subject)
     
     def get_workflow_graph(self) -> str:
         """Get visual representation of the workflow graph."""
-        return """
-🔄 VEDYA LangGraph Workflow:
-
-    ┌─────────────┐
-    │ Supervisor  │
-    │   Agent     │
-    └──────┬──────┘
-           │
-    ┌──────▼──────┐
-    │   Planner   │
-    │    Agent    │
-    └──────┬──────┘
-           │
-    ┌──────▼──────┐
-    │  Content    │
-    │  Curator    │
-    └──────┬──────┘
-           │
-    ┌──────▼──────┐
-    │ Assessment  │
-    │   Agent     │
-    └──────┬──────┘
-           │
-    ┌──────▼──────┐
-    │  Manager    │
-    │   Agent     │
-    └──────┬──────┘
-           │
-        ┌──▼──┐
-        │ END │
-        └─────┘
-
-State Management: LangGraph Checkpointing
-Tool Integration: LangChain Tools
-Coordination: Shared State Graph
-"""
+        return WORKFLOW_GRAPH_ASCII
+
+
+# Default system configuration, read from the environment once at import. Each system gets its own
+# deep copy, so per-instance overrides never touch these defaults.
+_DEFAULT_CONFIG = MappingProxyType({
+    "database_url": os.getenv("DATABASE_URL", "sqlite:///vedya.db"),
+    "checkpoint_type": "memory",
+    "openai_api_key": os.getenv("OPENAI_API_KEY", "demo-key"),
+    "models": {
+        "supervisor": "gpt-4o",
+        "planner": "gpt-4o",
+        "content_curator": "gpt-4o",
+        "assessment": "gpt-4o",
+        "manager": "gpt-4o"
+    },
+    "langgraph": {
+        "parallel_execution": True,
+        "error_recovery": True,
+        "state_persistence": True
+    }
+})
 
 
 # Factory function for creating the system
 def create_vedya_langgraph_system(config: Dict[str, Any] = None) -> VEDYALangGraphSystem:
     """Create and configure the VEDYA LangGraph system."""
-    default_config = {
-        "database_url": os.getenv("DATABASE_URL", "sqlite:///vedya.db"),
-        "checkpoint_type": "memory",
-        "openai_api_key": os.getenv("OPENAI_API_KEY", "demo-key"),
-        "models": {
-            "supervisor": "gpt-4o",
-            "planner": "gpt-4o",
-            "content_curator": "gpt-4o",
-            "assessment": "gpt-4o",
-            "manager": "gpt-4o"
-        },
-        "langgraph": {
-            "parallel_execution": True,
-            "error_recovery": True,
-            "state_persistence": True
-        }
-    }
-    
+    system_config = copy.deepcopy(dict(_DEFAULT_CONFIG))
     if config:
-        default_config.update(config)
+        system_config.update(config)
     
-    return VEDYALangGraphSystem(default_config)
+    return VEDYALangGraphSystem(system_config)
 
 
 if __name__ == "__main__":
@@ -1547,4 +2326,11 @@ if __name__ == "__main__":
         email_summary = system.generate_email_summary(result)
         print(f"📧 Email Subject: {email_summary['subject']}")
     
+    # uvloop is optional; only the script entry point switches loops, importers keep their own
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    
     asyncio.run(demo())